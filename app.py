@@ -1,22 +1,46 @@
 import argparse
-import curses
+import csv
+import hashlib
 import os
+import sys
 import tempfile
-from subprocess import call
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
 from os import path
+from subprocess import call
+from urllib.parse import urlparse
 
-import requests
 import json
 
-from requests import RequestException
+from lib.cache import TTLCache
+from lib.client import ConnectClient
+from lib.connectors import Connector
+from lib.files import writeFileAtomically
+from lib.metrics import MetricsExporter, RequestMetrics
+from lib.ratelimit import RateLimiter
+from lib.snapshot import SnapshotStore
+from lib.trace import Tracer
+
+
+DEFAULT_CONCURRENCY = 8
+
+
+class App:
 
-from gupy.view import ListViewDataSource
-from lib.ui import UI
+    ACTIVE_CONNECTORS = 'ACTIVE_CONNECTORS.json'
+    BACKUP_MANIFEST = 'BACKUP_MANIFEST.json'
 
+    METRICS_INTERVAL = 15
 
-class App(ListViewDataSource):
+    CACHE_SIZE = 4096
+    CACHE_TTLS = {
+        'overview': 10,
+        'status': 2,
+        'tasks': 10,
+        'config': 30
+    }
 
-    def parseArgs(self):
+    @staticmethod
+    def parseArgs():
         argparser = argparse.ArgumentParser(
             prog='confluent-connect',
             description='Implements an interactive tool for the usage of the Confluent Connect REST interface.'
@@ -24,7 +48,14 @@ class App(ListViewDataSource):
 
         argparser.add_argument(
             'URL',
-            help='The URL of the cluster in the format https://HOST:PORT')
+            help='The URL of the cluster in the format https://HOST:PORT. Several clusters can be given, the interactive mode shows their connectors in a single list.',
+            nargs='*')
+
+        argparser.add_argument(
+            '--clusters',
+            help="Reads the clusters from a JSON file, containing either a list of URLs or an object mapping cluster names to URLs",
+            metavar='FILE'
+        )
 
         argparser.add_argument(
             '-c',
@@ -40,6 +71,12 @@ class App(ListViewDataSource):
             metavar='PATH'
         )
 
+        argparser.add_argument(
+            '--prune',
+            help="Deletes the config files of connectors which no longer exist from the --backup directory. Nothing is deleted if the cluster returns no connectors.",
+            action="store_true"
+        )
+
         argparser.add_argument(
             '-r',
             '--restore',
@@ -53,6 +90,12 @@ class App(ListViewDataSource):
             action="store_true"
         )
 
+        argparser.add_argument(
+            '--dry-run',
+            help="Only prints the changes --restore would apply to the cluster",
+            action="store_true"
+        )
+
         argparser.add_argument(
             '--jdbcSource',
             help="Uses the template for a JDBC Source Connector",
@@ -77,7 +120,191 @@ class App(ListViewDataSource):
             action="store_true"
         )
 
-        return argparser.parse_args()
+        argparser.add_argument(
+            '--list',
+            help="Prints the connectors without starting the interactive mode, each as soon as it is loaded",
+            action="store_true"
+        )
+
+        argparser.add_argument(
+            '--format',
+            help="Output format of --list (default: ndjson)",
+            choices=['ndjson', 'json', 'csv'],
+            default='ndjson'
+        )
+
+        argparser.add_argument(
+            '--state',
+            help="Only lists connectors in the given state, can be given multiple times",
+            action='append',
+            metavar='STATE'
+        )
+
+        argparser.add_argument(
+            '--type',
+            help="Only lists connectors of the given type, can be given multiple times",
+            action='append',
+            choices=['source', 'sink']
+        )
+
+        argparser.add_argument(
+            '--serve-metrics',
+            help="Serves metrics of the connectors and tasks in the Prometheus format on [HOST:]PORT. The clusters are polled every --watch SECONDS (default: %d)." % App.METRICS_INTERVAL,
+            type=App.parseHostAndPort,
+            metavar='[HOST:]PORT'
+        )
+
+        argparser.add_argument(
+            '--drift',
+            help="Compares the configs of all connectors with a backup created by --backup and prints the differences. Exits with 1 if any connector differs.",
+            metavar='PATH'
+        )
+
+        argparser.add_argument(
+            '--show-drift',
+            help="Shows whether the config of every connector differs from the backup in PATH as a column of the interactive mode",
+            metavar='PATH'
+        )
+
+        argparser.add_argument(
+            '--restart-failed',
+            help="Restarts all failed connectors and tasks of the cluster",
+            action="store_true"
+        )
+
+        argparser.add_argument(
+            '--concurrency',
+            help="Maximum number of parallel requests against the REST interface (default: %d)" % DEFAULT_CONCURRENCY,
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            metavar='N'
+        )
+
+        argparser.add_argument(
+            '--connect-timeout',
+            help="Seconds to wait for a connection to the REST interface (default: %g)" % ConnectClient.CONNECT_TIMEOUT,
+            type=float,
+            default=ConnectClient.CONNECT_TIMEOUT,
+            metavar='SECONDS'
+        )
+
+        argparser.add_argument(
+            '--read-timeout',
+            help="Seconds to wait for a response of the REST interface (default: %g)" % ConnectClient.READ_TIMEOUT,
+            type=float,
+            default=ConnectClient.READ_TIMEOUT,
+            metavar='SECONDS'
+        )
+
+        argparser.add_argument(
+            '--retries',
+            help="Number of retries of requests failing during rebalances or, if idempotent, because of server or connection errors (default: %d)" % ConnectClient.RETRIES,
+            type=int,
+            default=ConnectClient.RETRIES,
+            metavar='N'
+        )
+
+        argparser.add_argument(
+            '--rate-limit',
+            help="Maximum number of connector actions per second started by bulk actions on a cluster",
+            type=float,
+            metavar='N'
+        )
+
+        argparser.add_argument(
+            '-u',
+            '--user',
+            help="Authenticates with HTTP basic auth. The password is prompted for if omitted.",
+            metavar='USER[:PASSWORD]'
+        )
+
+        argparser.add_argument(
+            '--cert',
+            help="Client certificate used for mutual TLS, optionally containing the private key",
+            metavar='FILE'
+        )
+
+        argparser.add_argument(
+            '--key',
+            help="Private key of the client certificate",
+            metavar='FILE'
+        )
+
+        argparser.add_argument(
+            '--cacert',
+            help="CA bundle used to verify the certificate of the cluster",
+            metavar='FILE'
+        )
+
+        argparser.add_argument(
+            '-H',
+            '--header',
+            help="Additional header sent with every request, can be given multiple times",
+            action='append',
+            metavar="'NAME: VALUE'"
+        )
+
+        argparser.add_argument(
+            '--no-snapshot',
+            help="Neither shows the connectors of the last run while the interactive mode starts nor saves them",
+            action="store_true"
+        )
+
+        argparser.add_argument(
+            '--trace',
+            help="Appends a JSON line for every request and every rendering of the interactive mode to FILE",
+            metavar='FILE'
+        )
+
+        argparser.add_argument(
+            '-w',
+            '--watch',
+            help="Starts in watch mode, updating the changed connectors every SECONDS",
+            type=float,
+            metavar='SECONDS'
+        )
+
+        args = argparser.parse_args()
+        if not args.URL and not args.clusters:
+            argparser.error('the URL of at least one cluster is required')
+
+        return args
+
+    @staticmethod
+    def parseHostAndPort(value):
+        # Parses [HOST:]PORT of --serve-metrics, so malformed values are reported as usage errors
+        host, _, port = value.rpartition(':')
+        if not port.isdecimal() or int(port) > 65535:
+            raise argparse.ArgumentTypeError("invalid port in '%s'" % value)
+
+        return (host, int(port))
+
+    @staticmethod
+    def clustersFromArgs(args):
+        # Returns the names and URLs of all clusters given on the command line or in the cluster file
+        clusters = [(App.clusterName(url), url) for url in args.URL]
+        if args.clusters:
+            with open(args.clusters) as clustersFile:
+                content = json.load(clustersFile)
+
+            if isinstance(content, dict):
+                clusters.extend(content.items())
+            else:
+                clusters.extend((App.clusterName(url), url) for url in content)
+
+        # Clusters are told apart by their names, URLs sharing a host and port would otherwise replace each other
+        names = set()
+        for name, url in clusters:
+            if name in names:
+                print('The cluster name %s is used more than once, name the clusters in a cluster file' % name)
+                exit(2)
+            names.add(name)
+
+        return clusters
+
+    @staticmethod
+    def clusterName(url):
+        return urlparse(url).netloc or url
 
     def configFromArgs(self, args):
         config = dict()
@@ -109,20 +336,78 @@ class App(ListViewDataSource):
 
         return config
 
-    def __init__(self):
-
-        args = self.parseArgs()
-        self.host = args.URL
+    @staticmethod
+    def clientsFromArgs(args, urls):
+        # The password is only prompted for once and used for all clusters
+        auth = None
+        if args.user:
+            user, _, password = args.user.partition(':')
+            if not password:
+                import getpass
+                password = getpass.getpass("Password for '%s': " % user)
+            auth = (user, password)
+
+        cert = None
+        if args.cert:
+            cert = (args.cert, args.key) if args.key else args.cert
+
+        verify = args.cacert if args.cacert else True
+
+        headers = dict()
+        for header in args.header or []:
+            name, _, value = header.partition(':')
+            headers[name.strip()] = value.strip()
+
+        return [ConnectClient(url, args.concurrency, auth=auth, cert=cert, verify=verify, headers=headers,
+                              timeout=(args.connect_timeout, args.read_timeout), retries=args.retries) for url in urls]
+
+    def __init__(self, host, concurrency=DEFAULT_CONCURRENCY, client=None, cluster=None):
+        self.host = host
+        self.cluster = cluster if cluster else self.clusterName(host)
+        self.concurrency = max(1, concurrency)
+        self.watchInterval = None
+        self.rateLimiter = None
+        self.version = None
+        self.tracer = None
+        self.snapshots = None
+        self.driftDirectory = None
+        self.client = client if client else ConnectClient(host, self.concurrency)
+        self.requests = RequestMetrics()
+        self.requests.observe(self.client, self.cluster)
+        self.cache = TTLCache(self.CACHE_SIZE)
+
+    def run(self, args, clusters=None):
+        # Only the interactive mode works on several clusters, all other modes work on this one
+        clusters = clusters if clusters else [self]
+        if len(clusters) > 1 and (args.create or args.restore or args.backup or args.info or args.plugins or args.restart_failed or args.list or args.drift):
+            print('Only the interactive mode supports multiple clusters')
+            exit(2)
+
+        if len(clusters) > 1 and args.show_drift:
+            print('A backup can only be compared with a single cluster')
+            exit(2)
+
+        if args.show_drift and not self.checkDirectory(args.show_drift):
+            exit(1)
+
+        if args.trace:
+            tracer = Tracer(open(args.trace, 'a'))
+            for app in clusters:
+                app.tracer = tracer
+                tracer.observe(app.client, app.cluster)
 
         if args.create:
             config = self.configFromArgs(args)
             self.buildConnector(args.create, config)
 
         elif args.restore:
-            self.restoreConnectors(args.restore, args.directory)
+            results = self.restoreConnectors(args.restore, args.directory, args.dry_run)
+            if results is None or any(error for _, _, _, error in results):
+                exit(1)
 
         elif args.backup:
-            self.backupConnectors(args.backup)
+            if self.backupConnectors(args.backup, args.prune) is None:
+                exit(1)
 
         elif args.info:
             self.printInfo()
@@ -130,140 +415,351 @@ class App(ListViewDataSource):
         elif args.plugins:
             self.printPlugins()
 
+        elif args.drift:
+            if not self.checkDirectory(args.drift):
+                exit(1)
+
+            results = self.printDrift(args.drift)
+            if any(state != 'in-sync' for state, _, _ in results.values()):
+                exit(1)
+
+        elif args.serve_metrics:
+            host, port = args.serve_metrics
+            self.serveMetrics(clusters, host, port, args.watch or self.METRICS_INTERVAL)
+
+        elif args.list:
+            states = [state.upper() for state in args.state] if args.state else None
+            try:
+                failures = self.printConnectors(args.format, states, args.type)
+            except BrokenPipeError:
+                # The reader of the list exited, like head does. Writes still buffered for stdout are discarded,
+                # flushing them at exit would fail again.
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                exit(1)
+
+            if failures:
+                exit(1)
+
+        elif args.restart_failed:
+            self.rateLimiter = RateLimiter(args.rate_limit) if args.rate_limit else None
+            errors = self.printRestartFailedTasks()
+            if any(errors.values()):
+                exit(1)
+
         else:
-            self.__connectors = []
-            ui = UI(self)
+            snapshots = SnapshotStore() if not args.no_snapshot else None
+            for app in clusters:
+                app.watchInterval = args.watch
+                app.rateLimiter = RateLimiter(args.rate_limit) if args.rate_limit else None
+                app.snapshots = snapshots
+                app.driftDirectory = args.show_drift
+
+            # Only the interactive mode imports curses and the UI, so the modes without a screen start faster
+            import curses
+            from lib.ui import UI
+
+            ui = UI(clusters)
             curses.wrapper(ui.loop)
 
     def getConnectInfos(self):
-        url = '%s/' % self.host
-        response = requests.get(url)
-        self.assertSuccess(response)
-
-        return json.loads(response.text)
+        return self.client.get('/')
 
     def getConnectorPlugins(self):
-        url = '%s/connector-plugins' % self.host
-        response = requests.get(url)
-        self.assertSuccess(response)
-
-        return json.loads(response.text)
+        return self.client.get('/connector-plugins')
 
     def getConnectors(self):
-        url = '%s/connectors' % self.host
-        response = requests.get(url)
-        self.assertSuccess(response)
+        return self.client.get('/connectors')
 
-        return json.loads(response.text)
+    def getConnectorsExpanded(self):
+        # Workers supporting the expand parameter return a map of connector names to their status and info.
+        # Older workers ignore the parameter and return the plain list of connector names.
+        return self.client.get('/connectors?expand=status&expand=info')
 
-    def getConnectorOverview(self, connector: str):
-        url = '%s/connectors/%s' % (self.host, connector)
-        response = requests.get(url)
-        self.assertSuccess(response)
+    def getConnectorOverview(self, connector: str, refresh=False):
+        return self.getCached('overview', connector, '/connectors/%s' % connector, refresh)
 
-        return json.loads(response.text)
+    def getConnectorStatus(self, connector: str, refresh=False):
+        return self.getCached('status', connector, '/connectors/%s/status' % connector, refresh)
 
-    def getConnectorStatus(self, connector: str):
-        url = '%s/connectors/%s/status' % (self.host, connector)
-        response = requests.get(url)
-        self.assertSuccess(response)
+    def getConnectorTasks(self, connector: str, refresh=False):
+        return self.getCached('tasks', connector, '/connectors/%s/tasks' % connector, refresh)
 
-        return json.loads(response.text)
+    def getConnectorConfig(self, connector: str, refresh=False):
+        return self.getCached('config', connector, '/connectors/%s/config' % connector, refresh)
 
-    def getConnectorTasks(self, connector: str):
-        url = '%s/connectors/%s/tasks' % (self.host, connector)
-        response = requests.get(url)
-        self.assertSuccess(response)
+    def getCached(self, endpoint, connector, path, refresh=False):
+        key = (endpoint, connector)
+        if not refresh:
+            found, value = self.cache.get(key)
+            if found:
+                return value
 
-        return json.loads(response.text)
+        value = self.client.get(path)
+        self.cache.put(key, value, self.CACHE_TTLS[endpoint])
 
-    def getConnectorConfig(self, connector: str):
-        url = '%s/connectors/%s/config' % (self.host, connector)
-        response = requests.get(url)
-        self.assertSuccess(response)
+        return value
 
-        return json.loads(response.text)
+    def invalidateCache(self, connector, endpoints):
+        self.cache.invalidate(*[(endpoint, connector) for endpoint in endpoints])
 
     def restartConnector(self, connector: str):
-        url = '%s/connectors/%s/restart' % (self.host, connector)
-        response = requests.post(url)
-        self.assertSuccess(response)
+        self.client.post('/connectors/%s/restart' % connector)
+        self.invalidateCache(connector, ['status'])
 
     def pauseConnector(self, connector: str):
-        url = '%s/connectors/%s/pause' % (self.host, connector)
-        response = requests.put(url)
-        self.assertSuccess(response)
+        self.client.put('/connectors/%s/pause' % connector)
+        self.invalidateCache(connector, ['status'])
 
     def resumeConnector(self, connector: str):
-        url = '%s/connectors/%s/resume' % (self.host, connector)
-        response = requests.put(url)
-        self.assertSuccess(response)
+        self.client.put('/connectors/%s/resume' % connector)
+        self.invalidateCache(connector, ['status'])
+
+    def restartTask(self, connector: str, taskId):
+        self.client.post('/connectors/%s/tasks/%s/restart' % (connector, taskId))
+        self.invalidateCache(connector, ['status', 'tasks'])
+
+    def restartFailedTasks(self, connector: str, status=None, onlyFailed=None):
+        # Restarts the connector if it failed and all of its failed tasks. Workers since Kafka 3.0 do so with a single
+        # request, older workers ignore its parameters and would restart the connector only, so its tasks are restarted one by one.
+        if status is None:
+            status = self.getConnectorStatus(connector, refresh=True)
+
+        if onlyFailed is None:
+            onlyFailed = self.supportsRestartOnlyFailed()
+
+        connectorFailed, taskIds = self.getFailedTasks(status)
+        if onlyFailed:
+            if connectorFailed or taskIds:
+                self.client.post('/connectors/%s/restart?includeTasks=true&onlyFailed=true' % connector)
+        else:
+            if connectorFailed:
+                self.client.post('/connectors/%s/restart' % connector)
+            for taskId in taskIds:
+                self.restartTask(connector, taskId)
+
+        self.invalidateCache(connector, ['status', 'tasks'])
+
+    def getFailedTasks(self, status):
+        connectorFailed = status['connector']['state'] == 'FAILED'
+        taskIds = [task['id'] for task in status['tasks'] if task['state'] == 'FAILED']
+        return (connectorFailed, taskIds)
+
+    def supportsRestartOnlyFailed(self):
+        if self.version is None:
+            self.version = self.getConnectInfos().get('version', '')
+
+        # Confluent Platform reports its own version, e.g. 7.0.0-ccs ships Kafka 3.0
+        release, _, suffix = self.version.partition('-')
+        try:
+            return tuple(int(part) for part in release.split('.')[:2]) >= ((7, 0) if suffix in ('ccs', 'ce') else (3, 0))
+        except ValueError:
+            return False
+
+    def restartAllFailedTasks(self, onFound=None, onPerformed=None, cancelled=None):
+        # The failed connectors are determined from the statuses of all connectors, which are fetched
+        # with a single request if supported. Only those are restarted, in parallel. The version of the
+        # workers is looked up once beforehand instead of by each of the parallel restarts.
+        statuses = self.getConnectorStatuses(cancelled)
+        failed = {connectorId: status for connectorId, status in statuses.items() if any(self.getFailedTasks(status))}
+        connectorIds = sorted(failed)
+        if onFound:
+            onFound([self.connectorRow(failed[connectorId], {}) for connectorId in connectorIds])
+
+        onlyFailed = self.supportsRestartOnlyFailed() if connectorIds else False
+        return self.performBulkAction(lambda connectorId: self.restartFailedTasks(connectorId, failed[connectorId], onlyFailed), connectorIds, onPerformed, cancelled)
 
     def createConnector(self, content: str):
-        url = '%s/connectors' % self.host
-        response = requests.post(url, json=json.loads(content))
-        self.assertSuccess(response)
+        self.client.post('/connectors', json.loads(content))
 
     def updateConfig(self, connector: str, content: str):
-        url = '%s/connectors/%s/config' % (self.host, connector)
-        response = requests.put(url, json=json.loads(content))
-        self.assertSuccess(response)
-
-    def assertSuccess(self, response: requests.Response):
-        if response.status_code not in range(200, 300):
-            message = "\n\nRequest %s '%s' failed (%s):\n%s\n" % (response.request.method, response.url, response.status_code, response.text)
-            raise RequestException(message)
+        self.client.put('/connectors/%s/config' % connector, json.loads(content))
+        self.invalidateCache(connector, self.CACHE_TTLS.keys())
 
     def prettyfyJson(self, aJson, sortKeys=True):
         return json.dumps(aJson, sort_keys=sortKeys, indent=4)
 
-    def number_of_rows(self) -> int:
-        return len(self.__connectors)
+    def getConnector(self, connectorId):
+        status = self.getConnectorStatus(connectorId, refresh=True)
+        config = self.getConnectorConfig(status['name'], refresh=True)
 
-    def get_data(self, i) -> object:
-        return self.__connectors[i]
+        return self.connectorRow(status, config)
+
+    def connectorRow(self, status, config):
+        state = status['connector']['state']
+        workerId = status['connector']['worker_id']
+        type = status['type']
+        name = status['name']
+        tasks = len(status['tasks'])
 
-    def getConnector(self, connectorId):
-        connector = self.getConnectorStatus(connectorId)
-        state = connector['connector']['state']
-        workerId = connector['connector']['worker_id']
-        type = connector['type']
-        name = connector['name']
-        tasks = len(connector['tasks'])
-
-        config = self.getConnectorConfig(name)
         if type == 'source':
-            topic = config['topic.prefix']
+            topic = config.get('topic.prefix')
         else:
-            topic = config['topics']
+            topic = config.get('topics')
 
-        return (state, type, workerId, tasks, topic, name)
+        return Connector.create(state, type, workerId, tasks, topic, name, self.cluster)
 
-    def refreshConnectors(self, onBegin=None, onFetchComplete=None, onLoadingBegin=None, onClomplete=None):
-        self.__connectors = []
-        if onBegin:
-            onBegin()
-
-        connectorIds = self.getConnectors()
-        connectorIds.sort()
+    def fetchConnectors(self, onFetchComplete=None, onLoadingBegin=None, cancelled=None, onFailed=None):
+        connectors = self.getConnectorsExpanded()
+        connectorIds = sorted(connectors)
         if onFetchComplete:
             onFetchComplete(connectorIds)
 
-        self.__connectors = []
-        i = 1
-        for connectorId in connectorIds:
-            if onLoadingBegin:
-                onLoadingBegin(i, len(connectorIds), connectorId)
-
-            self.__connectors.append(self.getConnector(connectorId))
-            i += 1
+        if isinstance(connectors, dict):
+            for connectorId, connector in connectors.items():
+                self.cache.put(('status', connectorId), connector['status'], self.CACHE_TTLS['status'])
+                self.cache.put(('config', connectorId), connector['info']['config'], self.CACHE_TTLS['config'])
 
-        if onClomplete:
-            onClomplete()
-
-    def refreshConnector(self, index):
-        _, _, _, _, _, connector = self.__connectors[index]
-        self.__connectors[index] = self.getConnector(connector)
+            return [self.connectorRow(connectors[connectorId]['status'], connectors[connectorId]['info']['config']) for connectorId in connectorIds]
+        else:
+            return [connector for connector in self.loadConnectors(connectorIds, onLoadingBegin, cancelled, onFailed) if connector is not None]
+
+    def loadConnectors(self, connectorIds, onLoaded=None, cancelled=None, onFailed=None):
+        return self.loadParallel(self.getConnector, connectorIds, onLoaded, cancelled, onFailed)
+
+    def loadParallel(self, request, connectorIds, onLoaded=None, cancelled=None, onFailed=None):
+        # The callback is invoked on the calling thread whenever a connector has been loaded.
+        # The result keeps the order of connectorIds, connectors which failed to load are None.
+        results = [None] * len(connectorIds)
+        for i, (index, result) in enumerate(self.iterParallel(request, connectorIds, cancelled, onFailed), 1):
+            if onLoaded:
+                onLoaded(i, len(connectorIds), connectorIds[index])
+
+            results[index] = result
+
+        return results
+
+    def iterParallel(self, request, connectorIds, cancelled=None, onFailed=None):
+        # The requests are made by a bounded pool of workers. Yields the index of every connector
+        # together with its result as soon as it has been loaded. Without onFailed the first failure
+        # aborts, otherwise failed connectors are reported to it with their error and skipped.
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(request, connectorId): index for index, connectorId in enumerate(connectorIds)}
+
+            for future in as_completed(futures):
+                if cancelled and cancelled.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    raise CancelledError()
+
+                try:
+                    result = future.result()
+                except CancelledError:
+                    raise
+                except Exception as error:
+                    if onFailed is None:
+                        # Otherwise leaving the executor would wait for all requests which have not been started yet
+                        for pending in futures:
+                            pending.cancel()
+                        raise
+                    onFailed(connectorIds[futures[future]], self.errorMessage(error))
+                    continue
+
+                yield (futures[future], result)
+
+    def bulkAction(self, name):
+        # Returns the action of the given name for performBulkAction. Restarts of failed tasks depend on
+        # the version of the workers, which is looked up once instead of by each of the parallel restarts.
+        if name == 'restartFailedTasks':
+            onlyFailed = self.supportsRestartOnlyFailed()
+            return lambda connectorId: self.restartFailedTasks(connectorId, onlyFailed=onlyFailed)
+
+        return getattr(self, name)
+
+    def performBulkAction(self, action, connectorIds, onPerformed=None, cancelled=None):
+        # Performs the action on all connectors in parallel, started at most at the rate of the rate limiter.
+        # Failures do not abort the other actions, the result maps every connector to its error or None.
+        # The callback is invoked on the calling thread whenever an action has been performed.
+        def perform(connectorId):
+            if self.rateLimiter:
+                self.rateLimiter.acquire(cancelled)
+
+            try:
+                action(connectorId)
+                return None
+            except CancelledError:
+                # Cancelled actions are not performed rather than failed
+                raise
+            except Exception as exception:
+                return self.errorMessage(exception)
+
+        errors = [None] * len(connectorIds)
+        for index, error in self.iterParallel(perform, connectorIds, cancelled):
+            errors[index] = error
+            if onPerformed:
+                onPerformed(connectorIds[index], error)
+
+        return dict(zip(connectorIds, errors))
+
+    def errorMessage(self, error):
+        lines = str(error).strip().splitlines()
+        return lines[0] if lines else type(error).__name__
+
+    def listConnectors(self, states=None, types=None, cancelled=None, onFailed=None):
+        # Yields the connectors as they are loaded. Without filters all connectors are loaded with a single request
+        # if supported. Otherwise the statuses are fetched first and only the configs of matching connectors are loaded.
+        if not states and not types:
+            connectors = self.getConnectorsExpanded()
+            if isinstance(connectors, dict):
+                for connectorId in sorted(connectors):
+                    yield self.connectorRow(connectors[connectorId]['status'], connectors[connectorId]['info']['config'])
+            else:
+                for _, connector in self.iterParallel(self.getConnector, connectors, cancelled, onFailed):
+                    yield connector
+            return
+
+        statuses = self.getConnectorStatuses(cancelled, onFailed)
+        matching = []
+        for connectorId in sorted(statuses):
+            connector = self.connectorRow(statuses[connectorId], {})
+            if (not states or connector.state in states) and (not types or connector.type in types):
+                matching.append(connectorId)
+
+        for index, config in self.iterParallel(lambda connectorId: self.getConnectorConfig(connectorId, refresh=True), matching, cancelled, onFailed):
+            yield self.connectorRow(statuses[matching[index]], config)
+
+    def getConnectorStatuses(self, cancelled=None, onFailed=None):
+        connectors = self.client.get('/connectors?expand=status')
+        if isinstance(connectors, dict):
+            for connectorId, connector in connectors.items():
+                self.cache.put(('status', connectorId), connector['status'], self.CACHE_TTLS['status'])
+
+            return {connectorId: connector['status'] for connectorId, connector in connectors.items()}
+
+        statuses = self.loadParallel(lambda connectorId: self.getConnectorStatus(connectorId, refresh=True), connectors, cancelled=cancelled, onFailed=onFailed)
+        return {connectorId: status for connectorId, status in zip(connectors, statuses) if status is not None}
+
+    def fetchConnectorChanges(self, connectors, cancelled=None, onFailed=None):
+        # Compares the current statuses with the given loaded connectors. Configs are only fetched for connectors
+        # which are new or whose status changed, unchanged connectors are not part of the result.
+        # Connectors which failed to load are reported to onFailed and neither changed nor removed.
+        current = {connector.name: connector for connector in connectors}
+        failed = set()
+
+        def onConnectorFailed(connectorId, error):
+            failed.add(connectorId)
+            onFailed(connectorId, error)
+
+        statuses = self.getConnectorStatuses(cancelled, onConnectorFailed if onFailed else None)
+
+        changedIds = []
+        for connectorId, status in statuses.items():
+            existing = current.get(connectorId)
+            if existing is None or not self.connectorRow(status, {}).statusEquals(existing):
+                changedIds.append(connectorId)
+
+        configs = self.loadParallel(lambda connectorId: self.getConnectorConfig(connectorId, refresh=True), changedIds, cancelled=cancelled,
+                                    onFailed=onConnectorFailed if onFailed else None)
+        changed = [self.connectorRow(statuses[connectorId], config) for connectorId, config in zip(changedIds, configs) if config is not None]
+        removed = [(self.cluster, connectorId) for connectorId in current if connectorId not in statuses and connectorId not in failed]
+
+        return (changed, removed)
+
+    def loadSnapshot(self):
+        return self.snapshots.load(self.host, self.cluster) if self.snapshots else None
+
+    def saveSnapshot(self, connectors):
+        if self.snapshots:
+            self.snapshots.save(self.host, connectors)
 
     def openEditor(self, content):
         EDITOR = os.environ.get('EDITOR', 'vim')
@@ -294,26 +790,38 @@ class App(ListViewDataSource):
     def loadConfigFiles(self, files):
         configs = {}
         for file in files:
-            with open(file) as jsonFile:
-                print(f'Reading config from {file}')
-                config = json.load(jsonFile)
-                jsonFile.close()
-
-                configs[file] = config
+            print(f'Reading config from {file}')
+            configs[file] = self.readConfigFile(file)
 
         return configs
 
+    def readConfigFile(self, file):
+        # Unreadable files are returned as their error, so they are reported instead of aborting a restore or comparison
+        try:
+            with open(file) as jsonFile:
+                return json.load(jsonFile)
+        except (OSError, ValueError) as error:
+            return error
+
     def loadConfigFilesFromDirectory(self, directory):
+        return self.loadConfigFiles(self.backupFiles(directory))
+
+    def backupFiles(self, directory):
+        # The config files of a backup, without the files written next to them and temporary files of interrupted writes
+        excludedFiles = [self.ACTIVE_CONNECTORS, self.BACKUP_MANIFEST]
+        return [path.join(directory, f) for f in sorted(os.listdir(directory))
+                if f not in excludedFiles and not f.startswith('.') and path.isfile(path.join(directory, f))]
+
+    def checkDirectory(self, directory):
         if not path.exists(directory):
             print("No such file ore directory: '%s'" % directory)
+            return False
 
         if not path.isdir(directory):
             print("'%s' is not a directory" % directory)
+            return False
 
-        files = [path.join(directory, f) for f in os.listdir(directory) if path.isfile(path.join(directory, f))]
-        result = self.loadConfigFiles(files)
-
-        return result
+        return True
 
     def loadConfigFilesFromList(self, listFile):
         if not path.exists(listFile):
@@ -340,22 +848,153 @@ class App(ListViewDataSource):
 
         return result
 
-    def restoreConnectors(self, listOrDirectory, isDirectory):
+    def parseBackupConfig(self, config):
+        # Returns the name and the config of a connector read from a backup file, in either of the formats
+        # of transformConfigIfNecessary. Raises a ValueError describing why a file cannot be used.
+        if isinstance(config, Exception):
+            raise ValueError(str(config))
+
+        try:
+            transformedConfig = self.transformConfigIfNecessary(config)
+            name = transformedConfig['name']
+        except (KeyError, TypeError):
+            raise ValueError('The config does not contain a connector name')
+
+        if not isinstance(transformedConfig['config'], dict):
+            raise ValueError('The config of the connector is not a JSON object')
+
+        return (name, transformedConfig['config'])
+
+    def restoreConnectors(self, listOrDirectory, isDirectory, dryRun=False):
+        if isDirectory and not self.checkDirectory(listOrDirectory):
+            return None
+
         if (isDirectory):
             configs = self.loadConfigFilesFromDirectory(listOrDirectory)
         else:
             configs = self.loadConfigFilesFromList(listOrDirectory)
 
-        print('\nRestoring Connectors...')
-        for filename, config in configs.items():
-            transformedConfig = self.transformConfigIfNecessary(config)
-            self.createConnector(self.prettyfyJson(transformedConfig))
+        liveConfigs = self.getConnectorConfigs()
+        plan = [self.planRestore(filename, config, liveConfigs) for filename, config in sorted(configs.items())]
+
+        print('\nPlanned changes:' if dryRun else '\nRestoring Connectors...')
+        for filename, action, name, content, diff in plan:
+            print('%-7s %s (%s)' % (action, name, filename))
+            for key, old, new in diff:
+                print(self.formatConfigDiff(key, old, new))
+
+        if dryRun:
+            return []
+
+        results = self.loadParallel(lambda step: self.executeRestore(*step), plan)
+
+        print()
+        for filename, action, name, error in results:
+            print('%-7s %s (%s)%s' % (action, name, filename, ' FAILED: %s' % error if error else ''))
+
+        failed = [result for result in results if result[3]]
+        print('\n%d succeeded, %d failed' % (len(results) - len(failed), len(failed)))
+
+        return results
+
+    def planRestore(self, filename, config, liveConfigs):
+        try:
+            name, connectorConfig = self.parseBackupConfig(config)
+        except ValueError as error:
+            return (filename, 'error', filename, str(error), [])
+
+        transformedConfig = {'name': name, 'config': connectorConfig}
+        liveConfig = liveConfigs.get(name)
+
+        if liveConfig is None:
+            return (filename, 'create', name, transformedConfig, [])
+
+        diff = self.diffConfigs(liveConfig, dict(connectorConfig, name=name))
+        if diff:
+            return (filename, 'update', name, transformedConfig, diff)
+
+        return (filename, 'skip', name, transformedConfig, [])
+
+    def executeRestore(self, filename, action, name, content, diff):
+        try:
+            if action == 'error':
+                raise ValueError(content)
+
+            if action == 'create':
+                self.createConnector(self.prettyfyJson(content))
+
+            elif action == 'update':
+                self.updateConfig(name, self.prettyfyJson(dict(content['config'], name=name)))
+
+            return (filename, action, name, None)
+
+        except Exception as error:
+            return (filename, action, name, self.errorMessage(error))
 
-            print(f'Restored connector {filename}')
+    def normalizeConfig(self, config):
+        # The REST interface returns all config values as strings, backups might contain other JSON types
+        return {key: value if isinstance(value, str) or value is None else json.dumps(value) for key, value in config.items()}
 
+    def diffConfigs(self, old, new):
+        old = self.normalizeConfig(old)
+        new = self.normalizeConfig(new)
+
+        keys = sorted(set(old) | set(new))
+        return [(key, old.get(key), new.get(key)) for key in keys if old.get(key) != new.get(key)]
+
+    def formatConfigDiff(self, key, old, new):
+        if old is None:
+            return '    + %s: %s' % (key, new)
+
+        if new is None:
+            return '    - %s: %s' % (key, old)
+
+        return '    ~ %s: %s -> %s' % (key, old, new)
+
+    def loadBackupConfigs(self, directory):
+        # Returns the configs of a backup by connector name, as the REST interface returns them, and the errors
+        # of unreadable files by the connector name of the file, so they replace the result of that connector
+        configs = {}
+        errors = {}
+        for file in self.backupFiles(directory):
+            try:
+                name, config = self.parseBackupConfig(self.readConfigFile(file))
+                configs[name] = dict(config, name=name)
+            except ValueError as error:
+                errors[path.splitext(path.basename(file))[0]] = self.errorMessage(error)
+
+        return (configs, errors)
+
+    def configHash(self, config):
+        return self.contentHash(json.dumps(self.normalizeConfig(config), sort_keys=True, separators=(',', ':')))
+
+    def detectDrift(self, directory, cancelled=None):
+        # Compares the live configs with a backup. Configs are compared by the hashes of their normalized form,
+        # only drifted connectors are diffed key by key. Returns the state, the diff and the error of every connector
+        # by name: in-sync, drifted, untracked (no backup), missing (only in the backup) or error.
+        backupConfigs, errors = self.loadBackupConfigs(directory)
+        liveConfigs = self.getConnectorConfigs(cancelled, onFailed=lambda connectorId, error: errors.__setitem__(connectorId, error))
+
+        results = {name: ('error', [], error) for name, error in errors.items()}
+        for name in sorted(set(backupConfigs) | set(liveConfigs)):
+            if name in results:
+                continue
+
+            backupConfig = backupConfigs.get(name)
+            liveConfig = liveConfigs.get(name)
+            if backupConfig is None:
+                results[name] = ('untracked', [], None)
+            elif liveConfig is None:
+                results[name] = ('missing', [], None)
+            elif self.configHash(backupConfig) == self.configHash(liveConfig):
+                results[name] = ('in-sync', [], None)
+            else:
+                results[name] = ('drifted', self.diffConfigs(backupConfig, liveConfig), None)
+
+        return results
 
     def updateConnector(self, connector):
-        config = self.getConnectorConfig(connector)
+        config = self.getConnectorConfig(connector, refresh=True)
         config = self.prettyfyJson(config)
         changed, updatedContent = self.openEditor(config)
 
@@ -363,9 +1002,9 @@ class App(ListViewDataSource):
             self.updateConfig(connector, updatedContent)
 
     def duplicateConnector(self, connector):
-        config = self.getConnectorConfig(connector)
-        name = config['name']
-        config.pop('name', None)
+        # Copied, as the cached config must not lose its name
+        config = dict(self.getConnectorConfig(connector, refresh=True))
+        name = config.pop('name')
 
         self.buildConnector(name, config)
 
@@ -373,42 +1012,181 @@ class App(ListViewDataSource):
         plugins = self.getConnectorPlugins()
         print(self.prettyfyJson(plugins))
 
+    def printDrift(self, directory):
+        results = self.detectDrift(directory)
+
+        for name, (state, diff, error) in sorted(results.items()):
+            if state == 'in-sync':
+                continue
+
+            print('%-9s %s%s' % (state, name, ': %s' % error if error else ''))
+            for key, old, new in diff:
+                print(self.formatConfigDiff(key, old, new))
+
+        counts = [sum(1 for state, _, _ in results.values() if state == result) for result in ['in-sync', 'drifted', 'untracked', 'missing', 'error']]
+        print('\n%d in sync, %d drifted, %d untracked, %d missing, %d errors' % tuple(counts))
+
+        return results
+
+    def printRestartFailedTasks(self):
+        def onFound(connectors):
+            print('Restarting %d failed connectors' % len(connectors))
+
+        def onPerformed(connectorId, error):
+            print('%s %s' % (connectorId, 'FAILED: %s' % error if error else 'restarted'))
+
+        errors = self.restartAllFailedTasks(onFound, onPerformed)
+
+        failed = [connectorId for connectorId, error in errors.items() if error]
+        print('\n%d succeeded, %d failed' % (len(errors) - len(failed), len(failed)))
+
+        return errors
+
+    def printConnectors(self, format='ndjson', states=None, types=None, out=sys.stdout):
+        # Every connector is written and flushed as soon as it is loaded. Connectors which failed to load are
+        # reported on stderr and returned, the others are printed anyway.
+        failures = dict()
+
+        def onFailed(connectorId, error):
+            failures[connectorId] = error
+            print('%s FAILED: %s' % (connectorId, error), file=sys.stderr)
+
+        connectors = self.listConnectors(states, types, onFailed=onFailed)
+
+        if format == 'csv':
+            writer = csv.writer(out)
+            writer.writerow(Connector._fields)
+            for connector in connectors:
+                writer.writerow(connector)
+                out.flush()
+
+        elif format == 'json':
+            out.write('[')
+            for i, connector in enumerate(connectors):
+                out.write('%s\n    %s' % (',' if i else '', json.dumps(connector._asdict())))
+                out.flush()
+            out.write('\n]\n')
+
+        else:
+            for connector in connectors:
+                out.write(json.dumps(connector._asdict()) + '\n')
+                out.flush()
+
+        return failures
+
+    def serveMetrics(self, clusters, host, port, interval):
+        print('Serving metrics of %s on http://%s:%d/metrics' % (', '.join(app.cluster for app in clusters), host or '0.0.0.0', port))
+        MetricsExporter(clusters, interval).serve(host, port)
+
     def printInfo(self):
         infos = self.getConnectInfos()
         print(self.prettyfyJson(infos))
 
-    def backupConnectors(self, directory):
-        if not path.exists(directory):
-            print("No such file ore directory: '%s'" % directory)
+    def backupConnectors(self, directory, prune=False):
+        # Config files of connectors which no longer exist are reported as removed, they are only deleted when pruning.
+        # An empty cluster, e.g. because of a wrong URL, never prunes a backup.
+        if not self.checkDirectory(directory):
+            return None
 
-        if not path.isdir(directory):
-            print("'%s' is not a directory" % directory)
+        configs = self.getConnectorConfigs()
+        connectorIds = sorted(configs)
+        if prune and not configs:
+            print('The cluster returned no connectors, the backup is not pruned')
+            prune = False
 
-        connectorIds = self.getConnectors()
-        connectorIds.sort()
-        maxConnectorLength = len(max(connectorIds, key=len))
+        maxConnectorLength = len(max(connectorIds, key=len, default=''))
+
+        manifestPath = path.join(directory, self.BACKUP_MANIFEST)
+        manifest = self.loadBackupManifest(manifestPath)
+        updatedManifest = dict()
+        summary = {'added': [], 'changed': [], 'unchanged': [], 'removed': []}
         configFiles = []
 
         for connectorId in connectorIds:
-            config = self.getConnectorConfig(connectorId)
-
             configFileName = f'{connectorId}.json'
             configPath = path.join(directory, configFileName)
-            configFile = open(configPath, 'w')
-            configFile.write(self.prettyfyJson(config))
-            configFile.close()
-
+            content = self.prettyfyJson(configs[connectorId])
+            contentHash = self.contentHash(content)
+
+            # The file itself is compared instead of the manifest, so files edited by hand are rewritten too
+            if not path.isfile(configPath):
+                result = 'added'
+            elif self.fileHash(configPath) != contentHash:
+                result = 'changed'
+            else:
+                result = 'unchanged'
+
+            if result != 'unchanged':
+                writeFileAtomically(configPath, content)
+
+            summary[result].append(connectorId)
+            updatedManifest[connectorId] = {'file': configFileName}
             configFiles.append(configFileName)
 
-            print('%s  =>  %s' % (connectorId.ljust(maxConnectorLength), configPath))
+            print('%s  =>  %s (%s)' % (connectorId.ljust(maxConnectorLength), configPath, result))
+
+        for connectorId, entry in manifest.items():
+            if connectorId not in updatedManifest:
+                removedPath = path.join(directory, entry['file'])
+                if not path.isfile(removedPath):
+                    continue
+
+                if prune:
+                    os.remove(removedPath)
+                else:
+                    # Kept in the manifest, so the file is reported again until it is pruned
+                    updatedManifest[connectorId] = entry
+
+                summary['removed'].append(connectorId)
+                print('%s  =>  %s (%s)' % (connectorId.ljust(maxConnectorLength), removedPath, 'removed' if prune else 'removed, file kept'))
+
+        activeConnectorsPath = path.join(directory, self.ACTIVE_CONNECTORS)
+        self.writeFileIfChanged(activeConnectorsPath, self.prettyfyJson(configFiles))
+        self.writeFileIfChanged(manifestPath, self.prettyfyJson(updatedManifest))
+
+        print('\n%d added, %d changed, %d unchanged, %d removed' % tuple(len(summary[result]) for result in ['added', 'changed', 'unchanged', 'removed']))
+        if summary['removed'] and not prune:
+            print('The files of removed connectors were kept, --prune deletes them')
+        print(f'A list of active connectors can be found here => {activeConnectorsPath}')
+
+        return summary
+
+    def getConnectorConfigs(self, cancelled=None, onFailed=None):
+        connectors = self.client.get('/connectors?expand=info')
+        if isinstance(connectors, dict):
+            return {connectorId: connector['info']['config'] for connectorId, connector in connectors.items()}
+
+        configs = self.loadParallel(lambda connectorId: self.getConnectorConfig(connectorId, refresh=True), connectors, cancelled=cancelled, onFailed=onFailed)
+        return {connectorId: config for connectorId, config in zip(connectors, configs) if config is not None}
+
+    def loadBackupManifest(self, manifestPath):
+        if not path.isfile(manifestPath):
+            return dict()
+
+        with open(manifestPath) as manifestFile:
+            return json.load(manifestFile)
+
+    def contentHash(self, content):
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def fileHash(self, filePath):
+        if not path.isfile(filePath):
+            return None
+
+        with open(filePath) as file:
+            return self.contentHash(file.read())
+
+    def writeFileIfChanged(self, filePath, content):
+        if self.fileHash(filePath) != self.contentHash(content):
+            writeFileAtomically(filePath, content)
 
-        activeConnectorsFileName = 'ACTIVE_CONNECTORS.json'
-        activeConnectorsPath = path.join(directory, activeConnectorsFileName)
-        file = open(activeConnectorsPath, 'w')
-        file.write(self.prettyfyJson(configFiles))
-        file.close()
+def main():
+    args = App.parseArgs()
+    clusters = App.clustersFromArgs(args)
+    clients = App.clientsFromArgs(args, [url for _, url in clusters])
+    apps = [App(url, args.concurrency, client, name) for (name, url), client in zip(clusters, clients)]
+    apps[0].run(args, apps)
 
-        print(f'\nA list of active connectors can be found here => {activeConnectorsPath}')
 
 if __name__ == '__main__':
-    App()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from lib.metrics import endpointOf
+
+
+class FakeConnectServer:
+    # A local stand-in for the REST interface of a Kafka Connect cluster. Every request is delayed by the given latency
+    # and fails with the given error rate. Workers older than 2.3 are simulated by not supporting the expand parameter.
+
+    WORKERS = ['worker-%d:8083' % i for i in range(1, 4)]
+
+    def __init__(self, connectors=100, latency=0.0, errorRate=0.0, version='3.6.0', failedRate=0.0, host='127.0.0.1', port=0, seed=1):
+        self.latency = latency
+        self.errorRate = errorRate
+        self.version = version
+        self.requests = Counter()
+        self.random = random.Random(seed)
+        self.connectors = OrderedDict()
+        self.lock = threading.Lock()
+
+        for i in range(connectors):
+            name = 'connector-%05d' % i
+            type = 'source' if i % 4 == 0 else 'sink'
+            config = {'name': name, 'connector.class': 'io.confluent.connect.jdbc.Jdbc%sConnector' % type.capitalize(), 'tasks.max': str(1 + i % 3)}
+            config['topic.prefix' if type == 'source' else 'topics'] = 'topic-%05d' % i
+            self.add(name, config, failed=self.random.random() < failedRate)
+
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def supportsExpand(self):
+        return tuple(int(part) for part in self.version.split('.')[:2]) >= (2, 3)
+
+    def add(self, name, config, failed=False):
+        tasks = int(config.get('tasks.max', 1))
+        worker = self.WORKERS[len(self.connectors) % len(self.WORKERS)]
+        self.connectors[name] = {
+            'config': dict(config, name=name),
+            'type': 'source' if 'Source' in config.get('connector.class', '') else 'sink',
+            'state': 'FAILED' if failed else 'RUNNING',
+            'worker': worker,
+            'tasks': ['FAILED' if failed and i == 0 else 'RUNNING' for i in range(tasks)]
+        }
+
+    def start(self):
+        # Polls for a shutdown often, so tests starting a server each do not wait for it to stop
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def resetRequests(self):
+        with self.lock:
+            self.requests.clear()
+
+    def countRequest(self, method, endpoint):
+        with self.lock:
+            self.requests[(method, endpoint)] += 1
+
+    def status(self, name, settle=True):
+        connector = self.connectors[name]
+        status = {
+            'name': name,
+            'type': connector['type'],
+            'connector': {'state': connector['state'], 'worker_id': connector['worker']},
+            'tasks': [{'id': i, 'state': state, 'worker_id': connector['worker']} for i, state in enumerate(connector['tasks'])]
+        }
+
+        # Restarting connectors and tasks run again once their state has been read
+        if not settle:
+            return status
+
+        if connector['state'] == 'RESTARTING':
+            connector['state'] = 'RUNNING'
+        connector['tasks'] = ['RUNNING' if state == 'RESTARTING' else state for state in connector['tasks']]
+
+        return status
+
+    def info(self, name):
+        connector = self.connectors[name]
+        return {
+            'name': name,
+            'config': dict(connector['config']),
+            'tasks': [{'connector': name, 'task': i} for i in range(len(connector['tasks']))],
+            'type': connector['type']
+        }
+
+    def handle(self, method, path, query, body):
+        # Returns the status code and the JSON content of the response
+        parts = [unquote(part) for part in path.strip('/').split('/')] if path.strip('/') else []
+
+        if parts == [] and method == 'GET':
+            return (200, {'version': self.version, 'commit': 'fake', 'kafka_cluster_id': 'fake'})
+
+        if parts == ['connector-plugins'] and method == 'GET':
+            return (200, [{'class': 'io.confluent.connect.jdbc.JdbcSinkConnector', 'type': 'sink', 'version': '10.7.4'},
+                          {'class': 'io.confluent.connect.jdbc.JdbcSourceConnector', 'type': 'source', 'version': '10.7.4'}])
+
+        if parts == ['connectors'] and method == 'GET':
+            expand = query.get('expand', [])
+            if not expand or not self.supportsExpand():
+                return (200, list(self.connectors))
+
+            result = {}
+            for name in list(self.connectors):
+                entry = {}
+                if 'status' in expand:
+                    entry['status'] = self.status(name)
+                if 'info' in expand:
+                    entry['info'] = self.info(name)
+                result[name] = entry
+            return (200, result)
+
+        if parts == ['connectors'] and method == 'POST':
+            if body['name'] in self.connectors:
+                return (409, {'error_code': 409, 'message': 'Connector %s already exists' % body['name']})
+            self.add(body['name'], body.get('config', {}))
+            return (201, self.info(body['name']))
+
+        if len(parts) < 2 or parts[0] != 'connectors':
+            return (404, {'error_code': 404, 'message': 'Unknown endpoint'})
+
+        name = parts[1]
+        if name not in self.connectors and not (parts[2:] == ['config'] and method == 'PUT'):
+            return (404, {'error_code': 404, 'message': 'Connector %s not found' % name})
+
+        action = parts[2:]
+        if action == [] and method == 'GET':
+            return (200, self.info(name))
+
+        if action == [] and method == 'DELETE':
+            del self.connectors[name]
+            return (204, None)
+
+        if action == ['status'] and method == 'GET':
+            return (200, self.status(name))
+
+        if action == ['config'] and method == 'GET':
+            return (200, dict(self.connectors[name]['config']))
+
+        if action == ['config'] and method == 'PUT':
+            if name in self.connectors:
+                self.connectors[name]['config'] = dict(body, name=name)
+                return (200, self.info(name))
+            self.add(name, body)
+            return (201, self.info(name))
+
+        if action == ['tasks'] and method == 'GET':
+            return (200, [{'id': {'connector': name, 'task': i}, 'config': {}} for i in range(len(self.connectors[name]['tasks']))])
+
+        if action == ['restart'] and method == 'POST':
+            connector = self.connectors[name]
+            includeTasks = query.get('includeTasks') == ['true'] and self.supportsRestartOnlyFailed()
+            onlyFailed = query.get('onlyFailed') == ['true'] and self.supportsRestartOnlyFailed()
+            if not includeTasks:
+                connector['state'] = 'RUNNING'
+                return (204, None)
+
+            # Like workers since Kafka 3.0, restarted connectors and tasks are reported as restarting until they run again
+            if not onlyFailed or connector['state'] == 'FAILED':
+                connector['state'] = 'RESTARTING'
+            connector['tasks'] = ['RESTARTING' if not onlyFailed or state == 'FAILED' else state for state in connector['tasks']]
+            return (202, self.status(name, settle=False))
+
+        if len(action) == 3 and action[0] == 'tasks' and action[2] == 'restart' and method == 'POST':
+            tasks = self.connectors[name]['tasks']
+            if not action[1].isdigit() or int(action[1]) >= len(tasks):
+                return (404, {'error_code': 404, 'message': 'Task not found'})
+            tasks[int(action[1])] = 'RUNNING'
+            return (204, None)
+
+        if action in (['pause'], ['resume']) and method == 'PUT':
+            self.connectors[name]['state'] = 'PAUSED' if action == ['pause'] else 'RUNNING'
+            return (202, None)
+
+        return (404, {'error_code': 404, 'message': 'Unknown endpoint'})
+
+    def supportsRestartOnlyFailed(self):
+        return tuple(int(part) for part in self.version.split('.')[:2]) >= (3, 0)
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keeps connections alive, like a Connect worker does. Headers and content are written separately,
+            # without disabling Nagle's algorithm every response would wait for the delayed ACK of the client.
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def respond(self, method):
+                url = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                server.countRequest(method, endpointOf(url.path))
+
+                if server.errorRate and server.random.random() < server.errorRate:
+                    status, content = (500, {'error_code': 500, 'message': 'Simulated error'})
+                else:
+                    with server.lock:
+                        status, content = server.handle(method, url.path, parse_qs(url.query), body)
+
+                payload = json.dumps(content).encode('utf-8') if content is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self.respond('GET')
+
+            def do_POST(self):
+                self.respond('POST')
+
+            def do_PUT(self):
+                self.respond('PUT')
+
+            def do_DELETE(self):
+                self.respond('DELETE')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Serves a fake Kafka Connect REST interface.')
+    argparser.add_argument('--connectors', type=int, default=100)
+    argparser.add_argument('--latency', type=float, default=0.0, help='Latency per request in seconds')
+    argparser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with status 500')
+    argparser.add_argument('--failed-rate', type=float, default=0.0, help='Fraction of failed connectors')
+    argparser.add_argument('--version', default='3.6.0', help='Reported worker version, versions before 2.3 do not support expand')
+    argparser.add_argument('--port', type=int, default=8083)
+    args = argparser.parse_args()
+
+    server = FakeConnectServer(args.connectors, args.latency, args.error_rate, args.version, args.failed_rate, port=args.port)
+    print('Serving %d connectors on %s' % (len(server.connectors), server.url), flush=True)
+    server.server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import App
+
+
+class SimulatedApp(App):
+    # Replaces the REST calls used by fetchConnectors with a fixed per-request latency.
+
+    def __init__(self, connectors, latency, concurrency, expand=False):
+        super().__init__('http://simulated:8083', concurrency)
+        self.connectorIds = ['connector-%05d' % i for i in range(connectors)]
+        self.latency = latency
+        self.expand = expand
+
+    def getConnectors(self):
+        time.sleep(self.latency)
+        return list(self.connectorIds)
+
+    def getConnectorsExpanded(self):
+        if not self.expand:
+            return self.getConnectors()
+
+        time.sleep(self.latency)
+        return {
+            connectorId: {
+                'status': self.status(connectorId),
+                'info': {'name': connectorId, 'config': self.config(connectorId), 'tasks': [], 'type': 'sink'}
+            }
+            for connectorId in self.connectorIds
+        }
+
+    def getConnectorStatus(self, connector: str, refresh=False):
+        time.sleep(self.latency)
+        return self.status(connector)
+
+    def getConnectorConfig(self, connector: str, refresh=False):
+        time.sleep(self.latency)
+        return self.config(connector)
+
+    def status(self, connector):
+        return {
+            'name': connector,
+            'type': 'sink',
+            'connector': {'state': 'RUNNING', 'worker_id': 'worker-1:8083'},
+            'tasks': [{'id': 0, 'state': 'RUNNING', 'worker_id': 'worker-1:8083'}]
+        }
+
+    def config(self, connector):
+        return {'name': connector, 'topics': 'topic-%s' % connector}
+
+
+def measure(connectors, latency, concurrency, expand=False):
+    app = SimulatedApp(connectors, latency, concurrency, expand)
+    begin = time.perf_counter()
+    loaded = app.fetchConnectors()
+    elapsed = time.perf_counter() - begin
+
+    assert [connector.name for connector in loaded] == app.connectorIds
+
+    return elapsed
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Compares sequential and parallel loading of connectors.')
+    argparser.add_argument('--connectors', type=int, default=200)
+    argparser.add_argument('--latency', type=float, default=0.01, help='Simulated latency per request in seconds')
+    argparser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    args = argparser.parse_args()
+
+    print('%d connectors, %.0f ms per request' % (args.connectors, args.latency * 1000))
+    baseline = None
+    for concurrency in args.concurrency:
+        elapsed = measure(args.connectors, args.latency, concurrency)
+        baseline = baseline or elapsed
+        print('concurrency=%-3d  %8.3f s  x%.1f' % (concurrency, elapsed, baseline / elapsed))
+
+    elapsed = measure(args.connectors, args.latency, 1, expand=True)
+    print('expand           %8.3f s  x%.1f' % (elapsed, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
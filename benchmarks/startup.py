@@ -0,0 +1,97 @@
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from suite import FakeCluster
+
+BASEDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# The same entry point as run.sh
+LAUNCHER = 'import sys; sys.path.insert(0, sys.argv.pop(1)); import app; app.main()'
+
+# The interactive mode needs a terminal, so only the imports it adds are measured
+UI_IMPORTS = 'import sys; sys.path.insert(0, sys.argv.pop(1)); import app, curses, lib.ui'
+
+MODES = OrderedDict([
+    ('help', lambda url, directory: (LAUNCHER, ['--help'])),
+    ('info', lambda url, directory: (LAUNCHER, ['--info', url])),
+    ('plugins', lambda url, directory: (LAUNCHER, ['--plugins', url])),
+    ('list', lambda url, directory: (LAUNCHER, ['--list', url])),
+    ('backup', lambda url, directory: (LAUNCHER, ['--backup', directory, url])),
+    ('ui-imports', lambda url, directory: (UI_IMPORTS, [])),
+])
+
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def runMode(code, args, importTime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importTime else []) + ['-c', code, BASEDIR] + args
+    begin = time.perf_counter()
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    return (time.perf_counter() - begin, result.stderr)
+
+
+def parseImportTimes(output):
+    # Returns the depth, name, cumulative microseconds and top level import of every import. Python reports
+    # imports after the ones they caused, so the top level imports are assigned in reverse order.
+    imports = []
+    for line in output.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            imports.append((len(match.group(3)) // 2, match.group(4), int(match.group(2))))
+
+    result = []
+    root = None
+    for depth, name, cumulative in reversed(imports):
+        if depth == 0:
+            root = name
+        result.append((depth, name, cumulative, root))
+
+    return result[::-1]
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Measures the start of the modes of the tool against a fake cluster, together with their slowest imports.')
+    argparser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    argparser.add_argument('--connectors', type=int, default=10)
+    argparser.add_argument('--runs', type=int, default=10, help='Number of runs per mode, the median wall time is reported')
+    argparser.add_argument('--top', type=int, default=8, help='Number of slowest imports shown per mode')
+    args = argparser.parse_args()
+    args.latency, args.error_rate, args.failed_rate, args.version = (0.0, 0.0, 0.0, '3.6.0')
+
+    with FakeCluster(args.connectors, args) as cluster:
+        directory = tempfile.mkdtemp(prefix='confluent-connect-startup-')
+        try:
+            print('%-12s %10s %10s' % ('mode', 'wall [ms]', 'imports [ms]'))
+            reports = []
+            for mode in args.modes:
+                code, modeArgs = MODES[mode](cluster.url, directory)
+                wallTimes = [runMode(code, modeArgs)[0] for _ in range(args.runs)]
+                imports = parseImportTimes(runMode(code, modeArgs, True)[1])
+
+                total = sum(cumulative for depth, _, cumulative, _ in imports if depth == 0)
+                print('%-12s %10.1f %10.1f' % (mode, statistics.median(wallTimes) * 1000, total / 1000))
+                reports.append((mode, imports))
+
+            # The imports made by the tool itself, either directly by app or lazily by a mode
+            for mode, imports in reports:
+                print('\n%s:' % mode)
+                tool = [(name, cumulative) for depth, name, cumulative, root in imports
+                        if root not in ('site', 'encodings', 'zipimport') and name != 'app' and (depth == 0 or root == 'app' and depth == 1)]
+                for name, cumulative in sorted(tool, key=lambda item: -item[1])[:args.top]:
+                    print('  %-30s %8.1f ms' % (name, cumulative / 1000))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
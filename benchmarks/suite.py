@@ -0,0 +1,151 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import App
+from lib.client import ConnectClient
+
+FAKE_CONNECT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_connect.py')
+
+
+class FakeCluster:
+    # Runs the fake REST interface in a process of its own, so it neither competes for the GIL
+    # nor shows up in the memory measured for the tool.
+
+    def __init__(self, connectors, args):
+        self.process = subprocess.Popen([sys.executable, FAKE_CONNECT, '--connectors', str(connectors), '--port', '0',
+                                         '--latency', str(args.latency), '--error-rate', str(args.error_rate),
+                                         '--failed-rate', str(args.failed_rate), '--version', args.version],
+                                        stdout=subprocess.PIPE, universal_newlines=True)
+        self.url = self.process.stdout.readline().split()[-1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.process.terminate()
+        self.process.wait()
+
+
+def setupRefresh(app, directory):
+    return app.fetchConnectors
+
+
+def setupList(app, directory):
+    return lambda: app.printConnectors('ndjson', out=io.StringIO())
+
+
+def setupListFailed(app, directory):
+    return lambda: app.printConnectors('ndjson', ['FAILED'], out=io.StringIO())
+
+
+def setupSync(app, directory):
+    # Only the update of already loaded connectors is measured
+    connectors = app.fetchConnectors()
+    return lambda: app.fetchConnectorChanges(connectors)
+
+
+def setupBackup(app, directory):
+    return lambda: app.backupConnectors(directory)
+
+
+def setupRestore(app, directory):
+    # Every tenth config of a backup is changed, so the restore updates them and skips all others
+    app.backupConnectors(directory)
+    for i, filename in enumerate(sorted(os.listdir(directory))):
+        if i % 10 == 0 and filename not in ('ACTIVE_CONNECTORS.json', App.BACKUP_MANIFEST):
+            filePath = os.path.join(directory, filename)
+            with open(filePath) as file:
+                config = json.load(file)
+            config['tasks.max'] = '8'
+            with open(filePath, 'w') as file:
+                json.dump(config, file)
+
+    return lambda: app.restoreConnectors(directory, True)
+
+
+MODES = OrderedDict([
+    ('refresh', setupRefresh),
+    ('list', setupList),
+    ('list-failed', setupListFailed),
+    ('sync', setupSync),
+    ('backup', setupBackup),
+    ('restore', setupRestore),
+])
+
+
+def measure(mode, connectors, args, traceMemory):
+    # Every run gets a fresh cluster and app, so no run profits from the caches or changes of another one
+    with FakeCluster(connectors, args) as cluster:
+        directory = tempfile.mkdtemp(prefix='confluent-connect-benchmark-')
+        try:
+            client = ConnectClient(cluster.url, args.concurrency)
+            app = App(cluster.url, args.concurrency, client)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                try:
+                    run = MODES[mode](app, directory)
+                except Exception as exception:
+                    return (0.0, 0, None, 'setup: %s' % app.errorMessage(exception))
+
+                requests = []
+                client.observers.append(lambda method, path, status, seconds, size: requests.append(status))
+
+                if traceMemory:
+                    tracemalloc.start()
+
+                begin = time.perf_counter()
+                try:
+                    run()
+                    error = None
+                except Exception as exception:
+                    error = app.errorMessage(exception)
+                elapsed = time.perf_counter() - begin
+
+                peak = None
+                if traceMemory:
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+
+            client.close()
+            return (elapsed, len(requests), peak, error)
+        finally:
+            shutil.rmtree(directory)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Measures wall time, requests and memory of the modes of the tool against a fake cluster.')
+    argparser.add_argument('--connectors', type=int, nargs='+', default=[10, 1000, 10000])
+    argparser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    argparser.add_argument('--latency', type=float, default=0.0, help='Latency per request in seconds')
+    argparser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with status 500')
+    argparser.add_argument('--failed-rate', type=float, default=0.01, help='Fraction of failed connectors')
+    argparser.add_argument('--version', default='3.6.0', help='Reported worker version, versions before 2.3 do not support expand')
+    argparser.add_argument('--concurrency', type=int, default=8)
+    argparser.add_argument('--no-memory', action='store_true', help='Skips the separate run measuring the peak memory')
+    args = argparser.parse_args()
+
+    print('%-12s %11s %10s %10s %12s' % ('mode', 'connectors', 'wall [s]', 'requests', 'peak [MiB]'))
+    for connectors in args.connectors:
+        for mode in args.modes:
+            # Tracing allocations slows down the tool, so the memory is measured in a run of its own
+            elapsed, requests, _, error = measure(mode, connectors, args, False)
+            peak = None if args.no_memory or error else measure(mode, connectors, args, True)[2]
+
+            print('%-12s %11d %10.3f %10d %12s%s' % (mode, connectors, elapsed, requests, '%.1f' % (peak / 2 ** 20) if peak is not None else '-',
+                                                     '  FAILED: %s' % error if error else ''))
+
+
+if __name__ == '__main__':
+    main()
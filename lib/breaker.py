@@ -0,0 +1,54 @@
+import threading
+import time
+
+from requests import RequestException
+
+
+class CircuitOpenError(RequestException):
+    pass
+
+
+class CircuitBreaker:
+    # A thread safe circuit breaker. It opens after threshold consecutive failures, so requests fail immediately
+    # instead of waiting for timeouts while a cluster is down. Once resetTimeout seconds have passed a single
+    # request is let through, its success closes the circuit again while its failure keeps it open.
+
+    def __init__(self, threshold=5, resetTimeout=30.0):
+        self.threshold = threshold
+        self.resetTimeout = resetTimeout
+        self.__failures = 0
+        self.__openedAt = None
+        self.__probing = False
+        self.__lock = threading.Lock()
+
+    def allow(self):
+        with self.__lock:
+            if self.__openedAt is None:
+                return True
+
+            if not self.__probing and time.monotonic() - self.__openedAt >= self.resetTimeout:
+                self.__probing = True
+                return True
+
+            return False
+
+    def succeeded(self):
+        with self.__lock:
+            self.__failures = 0
+            self.__openedAt = None
+            self.__probing = False
+
+    def failed(self):
+        with self.__lock:
+            self.__failures += 1
+            if self.__failures >= self.threshold or self.__probing:
+                self.__openedAt = time.monotonic()
+            self.__probing = False
+
+    def isOpen(self):
+        with self.__lock:
+            return self.__openedAt is not None
+
+    def retryIn(self):
+        with self.__lock:
+            return max(0.0, self.__openedAt + self.resetTimeout - time.monotonic()) if self.__openedAt is not None else 0.0
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+
+class BulkProgress:
+    # Collects the results of an action performed on several connectors, possibly of several clusters.
+    # Connectors can be added while the action is running, e.g. once the failed connectors are known.
+
+    def __init__(self, description, connectors=()):
+        self.description = description
+        self.connectors = OrderedDict()
+        self.succeeded = []
+        self.failed = []
+        self.addConnectors(connectors)
+
+    def addConnectors(self, connectors):
+        for connector in connectors:
+            self.connectors[connector.key()] = connector
+
+    def add(self, key, error):
+        connector = self.connectors[key]
+        if error:
+            self.failed.append((connector, error))
+        else:
+            self.succeeded.append(connector)
+
+    def done(self):
+        return len(self.succeeded) + len(self.failed)
+
+    def isComplete(self):
+        return self.done() >= len(self.connectors)
+
+    def summary(self):
+        return '%s (%d|%d, %d failed)' % (self.description, self.done(), len(self.connectors), len(self.failed))
+
+    def report(self, label=lambda connector: connector.name):
+        lines = ['%s: %d succeeded, %d failed, %d not performed' % (self.description, len(self.succeeded), len(self.failed),
+                                                                   len(self.connectors) - self.done())]
+
+        if self.failed:
+            lines += ['', 'Failed:']
+            lines += ['  %s: %s' % (label(connector), error) for connector, error in sorted(self.failed, key=lambda failure: failure[0].sortKey())]
+
+        if self.succeeded:
+            lines += ['', 'Succeeded:']
+            lines += ['  %s' % label(connector) for connector in sorted(self.succeeded, key=lambda connector: connector.sortKey())]
+
+        performed = set(connector.key() for connector in self.succeeded) | set(connector.key() for connector, _ in self.failed)
+        notPerformed = [connector for key, connector in self.connectors.items() if key not in performed]
+        if notPerformed:
+            lines += ['', 'Not performed:']
+            lines += ['  %s' % label(connector) for connector in sorted(notPerformed, key=lambda connector: connector.sortKey())]
+
+        return '\n'.join(lines)
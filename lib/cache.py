@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    # A thread safe LRU cache whose entries expire after a time to live given per entry.
+
+    def __init__(self, maxSize=1024):
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return (True, value)
+
+                del self.__entries[key]
+
+            self.misses += 1
+            return (False, None)
+
+    def put(self, key, value, ttl):
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + ttl, value)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.maxSize:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self.__lock:
+            for key in keys:
+                self.__entries.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        with self.__lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self.__entries),
+                'maxSize': self.maxSize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / requests if requests else 0.0
+            }
@@ -0,0 +1,126 @@
+import json
+import random
+import time
+
+import requests
+from requests import RequestException
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectTimeout
+
+from lib.breaker import CircuitBreaker, CircuitOpenError
+
+
+class ConnectClient:
+
+    HEADERS = {
+        'Accept': 'application/json',
+        'Content-Type': 'application/json'
+    }
+
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+
+    CONNECT_TIMEOUT = 5.0
+    READ_TIMEOUT = 30.0
+    RETRIES = 3
+    RETRY_DELAY = 0.25
+    RETRY_MAX_DELAY = 5.0
+
+    def __init__(self, host, poolSize=1, auth=None, cert=None, verify=True, headers=None,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries=RETRIES, breaker=None):
+        self.host = host.rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.breaker = breaker if breaker else CircuitBreaker()
+
+        # All requests share one session, so connections (including their TLS handshake) are kept alive and reused.
+        # The pool blocks instead of opening additional connections once poolSize connections are in use.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, poolSize), pool_block=True)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(self.HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+        self.session.auth = auth
+        self.session.cert = cert
+        self.session.verify = verify
+
+        # Called with the method, path, status code (None if the request failed), duration and size of the response of every request
+        self.observers = []
+
+    def url(self, path):
+        return '%s%s' % (self.host, path)
+
+    def request(self, method, path, content=None):
+        # Failed attempts are retried with jittered exponential backoff: rebalances for all methods, errors of the
+        # connection and of the server only for idempotent methods, as others might already have been performed.
+        # While the circuit breaker of the cluster is open, requests fail without being sent.
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("Request %s '%s' not sent, '%s' failed repeatedly (retrying in %ds)"
+                                       % (method, self.url(path), self.host, round(self.breaker.retryIn())))
+
+            try:
+                response = self.send(method, path, content)
+            except RequestException as error:
+                self.breaker.failed()
+                if attempt < self.retries and (method in self.IDEMPOTENT_METHODS or isinstance(error, ConnectTimeout)):
+                    attempt = self.backoff(attempt)
+                    continue
+                raise
+
+            if response.status_code >= 500:
+                self.breaker.failed()
+            else:
+                self.breaker.succeeded()
+
+            if attempt < self.retries and (self.isRebalance(response) or (response.status_code >= 500 and method in self.IDEMPOTENT_METHODS)):
+                attempt = self.backoff(attempt)
+                continue
+
+            self.assertSuccess(response)
+
+            return response
+
+    def send(self, method, path, content=None):
+        start = time.perf_counter()
+        status = None
+        size = 0
+        try:
+            response = self.session.request(method, self.url(path), json=content, timeout=self.timeout)
+            status = response.status_code
+            size = len(response.content)
+        finally:
+            for observer in self.observers:
+                observer(method, path, status, time.perf_counter() - start, size)
+
+        return response
+
+    def backoff(self, attempt):
+        time.sleep(random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_DELAY * 2 ** attempt)))
+        return attempt + 1
+
+    def isRebalance(self, response):
+        # Connect answers with 409 while the workers rebalance, but also if e.g. a connector already exists
+        return response.status_code == 409 and 'rebalanc' in response.text.lower()
+
+    def get(self, path):
+        response = self.request('GET', path)
+        return json.loads(response.text)
+
+    def post(self, path, content=None):
+        return self.request('POST', path, content)
+
+    def put(self, path, content=None):
+        return self.request('PUT', path, content)
+
+    def close(self):
+        self.session.close()
+
+    def assertSuccess(self, response: requests.Response):
+        if response.status_code not in range(200, 300):
+            message = "\n\nRequest %s '%s' failed (%s):\n%s\n" % (response.request.method, response.url, response.status_code, response.text)
+            raise RequestException(message)
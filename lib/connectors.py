@@ -0,0 +1,163 @@
+import sys
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from lib.search import TrigramIndex
+
+
+class Connector(NamedTuple):
+    state: str
+    type: str
+    workerId: str
+    tasks: int
+    topic: Optional[str]
+    name: str
+    cluster: Optional[str] = None
+
+    @classmethod
+    def create(cls, state, type, workerId, tasks, topic, name, cluster=None):
+        # The few distinct states, types, worker ids and clusters are shared by all connectors
+        return cls(sys.intern(state), sys.intern(type), sys.intern(workerId) if workerId else workerId, tasks, topic, name,
+                   sys.intern(cluster) if cluster else cluster)
+
+    def key(self):
+        # Connectors of different clusters may have the same name
+        return (self.cluster, self.name)
+
+    def sortKey(self):
+        return (self.name, self.cluster or '')
+
+    def statusEquals(self, other):
+        return self.state == other.state and self.type == other.type and self.workerId == other.workerId and self.tasks == other.tasks
+
+    def searchText(self):
+        return '\0'.join([self.name, self.topic or '', self.workerId or '', self.state, self.type, self.cluster or ''])
+
+
+class ConnectorStore:
+    # Keeps the connectors sorted by name and cluster together with an index of their positions and a search index.
+    # The version is incremented on every change, so views on the store know when to update.
+
+    def __init__(self, connectors=()):
+        self.version = 0
+        self.set(connectors)
+
+    @staticmethod
+    def sort(connectors):
+        return sorted(connectors, key=Connector.sortKey)
+
+    @staticmethod
+    def createSearchIndex(sortedConnectors):
+        return TrigramIndex(connector.searchText() for connector in sortedConnectors)
+
+    def set(self, connectors, searchIndex=None):
+        # A search index created from the sorted connectors can be passed in, e.g. if it was built in the background
+        self.__connectors = self.sort(connectors)
+        self.__searchIndex = searchIndex if searchIndex is not None and len(searchIndex) == len(self.__connectors) else None
+        self.__reindex()
+        self.version += 1
+
+    def setCluster(self, cluster, connectors, searchIndex=None):
+        # Replaces the connectors of a single cluster, keeping the ones of all other clusters
+        others = [connector for connector in self.__connectors if connector.cluster != cluster]
+        if others:
+            self.set(others + list(connectors))
+        else:
+            self.set(connectors, searchIndex)
+
+    def __reindex(self):
+        self.__sortKeys = [connector.sortKey() for connector in self.__connectors]
+        self.__indices = {connector.key(): index for index, connector in enumerate(self.__connectors)}
+
+    def getSearchIndex(self):
+        if self.__searchIndex is None:
+            self.__searchIndex = self.createSearchIndex(self.__connectors)
+
+        return self.__searchIndex
+
+    def number_of_rows(self) -> int:
+        return len(self.__connectors)
+
+    def get_data(self, i) -> object:
+        return self.__connectors[i]
+
+    def __len__(self):
+        return len(self.__connectors)
+
+    def __iter__(self):
+        return iter(list(self.__connectors))
+
+    def clusters(self):
+        return sorted({connector.cluster for connector in self.__connectors if connector.cluster})
+
+    def indexOf(self, key):
+        return self.__indices.get(key)
+
+    def get(self, key):
+        index = self.__indices.get(key)
+        return self.__connectors[index] if index is not None else None
+
+    def replace(self, connector):
+        index = self.__indices.get(connector.key())
+        if index is not None:
+            self.__setAt(index, connector)
+            self.version += 1
+
+    def __setAt(self, index, connector):
+        self.__connectors[index] = connector
+        if self.__searchIndex is not None:
+            self.__searchIndex.update(index, connector.searchText())
+
+    def apply(self, changed, removed):
+        # Removed connectors are given by their keys
+        removed = set(removed)
+        structural = bool(removed)
+        if removed:
+            self.__connectors = [connector for connector in self.__connectors if connector.key() not in removed]
+            self.__sortKeys = [connector.sortKey() for connector in self.__connectors]
+
+        for connector in changed:
+            sortKey = connector.sortKey()
+            index = bisect_left(self.__sortKeys, sortKey)
+            if index < len(self.__sortKeys) and self.__sortKeys[index] == sortKey:
+                self.__setAt(index, connector)
+            else:
+                self.__sortKeys.insert(index, sortKey)
+                self.__connectors.insert(index, connector)
+                structural = True
+
+        if structural:
+            # Positions changed, the search index is rebuilt once it is needed again
+            self.__searchIndex = None
+            self.__reindex()
+
+        self.version += 1
+
+
+class ConnectorGroup(NamedTuple):
+    key: tuple
+    count: int
+
+    def label(self):
+        return ' / '.join(str(value) for value in self.key)
+
+
+STATE_ORDER = {'FAILED': 0, 'UNASSIGNED': 1, 'RESTARTING': 2, 'STOPPED': 3, 'PAUSED': 4, 'RUNNING': 5}
+
+SORT_KEYS = OrderedDict([
+    ('name', None),
+    ('state', lambda connector: (STATE_ORDER.get(connector.state, len(STATE_ORDER)), connector.name)),
+    ('worker', lambda connector: (connector.workerId or '', connector.name)),
+    ('type', lambda connector: (connector.type, connector.name)),
+    ('cluster', lambda connector: (connector.cluster or '', connector.name)),
+])
+
+GROUP_KEYS = OrderedDict([
+    ('none', None),
+    ('state', lambda connector: (connector.state,)),
+    ('worker', lambda connector: (connector.workerId,)),
+    ('type', lambda connector: (connector.type,)),
+    ('state/worker/type', lambda connector: (connector.state, connector.workerId, connector.type)),
+    ('cluster', lambda connector: (connector.cluster,)),
+])
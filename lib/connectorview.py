@@ -0,0 +1,118 @@
+from bisect import bisect_left
+from collections import OrderedDict
+
+from gupy.view import ListViewDataSource
+from lib.connectors import GROUP_KEYS, SORT_KEYS, ConnectorGroup
+
+
+class ConnectorView(ListViewDataSource):
+    # A filtered, sorted and grouped view on a ConnectorStore. Only the positions of the shown rows are kept.
+    # They are recomputed lazily once the query, the order or the store changed, never while rendering.
+
+    def __init__(self, store):
+        self.store = store
+        self.query = ''
+        self.sortBy = 'name'
+        self.groupBy = 'none'
+        self.cluster = None
+        self.__rows = None
+        self.__rowIndices = None
+        self.__version = None
+        self.__matches = None
+        self.__matchesQuery = None
+        self.__matchesVersion = None
+
+    def setQuery(self, query):
+        self.query = query
+        self.__version = None
+
+    def setSortBy(self, sortBy):
+        self.sortBy = sortBy
+        self.__version = None
+
+    def setGroupBy(self, groupBy):
+        self.groupBy = groupBy
+        self.__version = None
+
+    def setCluster(self, cluster):
+        # Only shows the connectors of the given cluster, None shows all clusters
+        self.cluster = cluster
+        self.__version = None
+
+    def __update(self):
+        if self.__version == self.store.version:
+            return
+
+        positions = None
+        if not self.query.strip():
+            self.__matches = None
+        else:
+            # While typing, the query usually extends the previous one, so only its matches need to be checked
+            candidates = None
+            if self.__matches is not None and self.__matchesVersion == self.store.version and self.query.startswith(self.__matchesQuery):
+                candidates = self.__matches
+
+            self.__matches = self.store.getSearchIndex().search(self.query, candidates)
+            if len(self.__matches) < len(self.store):
+                positions = sorted(self.__matches)
+
+        self.__matchesQuery = self.query
+        self.__matchesVersion = self.store.version
+        self.__version = self.store.version
+
+        get = self.store.get_data
+        if self.cluster is not None:
+            positions = [position for position in (positions if positions is not None else range(len(self.store)))
+                         if get(position).cluster == self.cluster]
+
+        sortKey = SORT_KEYS[self.sortBy]
+        groupKey = GROUP_KEYS[self.groupBy]
+        if sortKey is None and groupKey is None:
+            # Rows are shown in the order of the store, no need for a reverse index
+            self.__rows = positions
+            self.__rowIndices = None
+            return
+
+        if positions is None:
+            positions = range(len(self.store))
+
+        if sortKey is not None:
+            positions = sorted(positions, key=lambda position: sortKey(get(position)))
+
+        rows = list(positions)
+        if groupKey is not None:
+            groups = OrderedDict()
+            for position in positions:
+                groups.setdefault(groupKey(get(position)), []).append(position)
+
+            rows = []
+            for key in sorted(groups, key=lambda key: tuple('' if value is None else str(value) for value in key)):
+                rows.append(ConnectorGroup(key, len(groups[key])))
+                rows.extend(groups[key])
+
+        self.__rows = rows
+        self.__rowIndices = {position: index for index, position in enumerate(rows) if isinstance(position, int)}
+
+    def number_of_rows(self) -> int:
+        self.__update()
+        return len(self.__rows) if self.__rows is not None else self.store.number_of_rows()
+
+    def get_data(self, i) -> object:
+        self.__update()
+        if self.__rows is None:
+            return self.store.get_data(i)
+
+        row = self.__rows[i]
+        return row if isinstance(row, ConnectorGroup) else self.store.get_data(row)
+
+    def indexOf(self, key):
+        self.__update()
+        index = self.store.indexOf(key)
+        if index is None or self.__rows is None:
+            return index
+
+        if self.__rowIndices is not None:
+            return self.__rowIndices.get(index)
+
+        position = bisect_left(self.__rows, index)
+        return position if position < len(self.__rows) and self.__rows[position] == index else None
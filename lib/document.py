@@ -1,4 +1,8 @@
 import sys
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
 
 from gupy.view import ListViewDataSource
 import textwrap
@@ -6,37 +10,216 @@ import textwrap
 
 class Document(ListViewDataSource):
 
+    MAX_CACHED_LAYOUTS = 4
+    MAX_CACHED_LINES = 1024
+    LAYOUT_CHUNK = 256
+
     def __init__(self, text):
         self.__text = text
+        self.__indexLines()
+
+        self.__layouts = OrderedDict()
+        self.__wrappedLines = OrderedDict()
+        self.__requestedRow = 0
         self.wrapToWidth(sys.maxsize)
 
+        self.__foldedText = None
+        self.__query = ''
+        self.__matches = array('q')
+
+    def __indexLines(self):
+        # Only the offsets of the lines are kept, the lines themselves are sliced from the text when they
+        # need to be wrapped. Lines that are blank or contain tabs are always wrapped, as textwrap alters their length.
+        self.__lineStarts = array('q')
+        self.__lineLengths = array('q')
+        self.__alwaysWrap = bytearray()
+
+        start = 0
+        while True:
+            end = self.__text.find('\n', start)
+            if end == -1:
+                end = len(self.__text)
+
+            line = self.__text[start:end]
+            self.__lineStarts.append(start)
+            self.__lineLengths.append(end - start)
+            self.__alwaysWrap.append(not line.strip() or '\t' in line)
+
+            if end == len(self.__text):
+                break
+            start = end + 1
+
     def wrapToWidth(self, width):
-        lines = []
+        width = max(1, width)
+        self.__width = width
+
+        if width in self.__layouts:
+            self.__layouts.move_to_end(width)
+        else:
+            # A layout holds the first row of every line laid out so far and the number of their rows
+            self.__layouts[width] = [array('q'), 0]
+            if len(self.__layouts) > self.MAX_CACHED_LAYOUTS:
+                self.__layouts.popitem(last=False)
+
+        self.__layout = self.__layouts[width]
+
+    def __layOutLines(self, end):
+        # Maps the lines before the given one to the index of their first wrapped row, continuing where the layout
+        # stopped. Lines fitting into the width are not wrapped.
+        rowStarts, rows = self.__layout
+        for i in range(len(rowStarts), min(end, len(self.__lineStarts))):
+            rowStarts.append(rows)
+            rows += self.__countRows(i, self.__width)
+
+        self.__layout[1] = rows
+
+    def __layOutRows(self, row):
+        # Lays out lines in chunks until the row exists or all lines are laid out
+        while self.__layout[1] <= row and not self.isLaidOut():
+            self.__layOutLines(len(self.__layout[0]) + self.LAYOUT_CHUNK)
+
+    def __countRows(self, i, width):
+        # Wrapping lines only to count their rows does not go through the cache, which holds the rows shown
+        if not self.__alwaysWrap[i] and self.__lineLengths[i] <= width:
+            return 1
+
+        wrappedLines = self.__wrappedLines.get((i, width))
+        if wrappedLines is None:
+            wrappedLines = textwrap.wrap(self.__line(i), width)
+        return len(wrappedLines)
+
+    def __line(self, i):
+        start = self.__lineStarts[i]
+        return self.__text[start:start + self.__lineLengths[i]]
+
+    def __wrapLine(self, i, width):
+        key = (i, width)
+        if key in self.__wrappedLines:
+            self.__wrappedLines.move_to_end(key)
+            return self.__wrappedLines[key]
+
+        wrappedLines = textwrap.wrap(self.__line(i), width)
+
+        self.__wrappedLines[key] = wrappedLines
+        if len(self.__wrappedLines) > self.MAX_CACHED_LINES:
+            self.__wrappedLines.popitem(last=False)
+
+        return wrappedLines
 
-        i = 1
-        for line in self.__text.split('\n'):
-            begin = True
-            for wrappedLine in textwrap.wrap(line, width):
-                lineNumber = i if begin else None
-                lines.append((lineNumber, wrappedLine))
+    def isLaidOut(self) -> bool:
+        return len(self.__layout[0]) == len(self.__lineStarts)
 
-                begin = False
+    def layOut(self, row=sys.maxsize):
+        # Lays out the lines up to the row, or all of them
+        self.__layOutRows(row)
 
-            i += 1
+    def continueLayout(self, seconds) -> bool:
+        # Lays out further lines for up to the given time, returns whether any were laid out
+        deadline = time.monotonic() + seconds
+        laidOut = False
+        while not self.isLaidOut() and time.monotonic() < deadline:
+            self.__layOutLines(len(self.__layout[0]) + self.LAYOUT_CHUNK)
+            laidOut = True
 
-        self.__lines = lines
-        self.__numeberOfUnwrappedLines = i-1
+        return laidOut
 
     def number_of_rows(self) -> int:
-        return len(self.__lines)
+        # Only the rows laid out so far are counted, the layout is kept a chunk ahead of the row requested last
+        self.__layOutRows(self.__requestedRow + self.LAYOUT_CHUNK)
+        return self.__layout[1]
 
     def get_data(self, i) -> object:
-        return self.__lines[i]
+        if i < 0:
+            self.layOut()
+            i += self.__layout[1]
+        else:
+            self.__layOutRows(i)
+            self.__requestedRow = i
+
+        rowStarts, rows = self.__layout
+        if not 0 <= i < rows:
+            raise IndexError('row index out of range')
+
+        line = bisect_right(rowStarts, i) - 1
+        row = i - rowStarts[line]
+        lineNumber = line + 1 if row == 0 else None
+
+        return (lineNumber, self.__wrapLine(line, self.__width)[row])
+
+    def search(self, query):
+        # Finds the offsets of all occurrences of the query, ignoring case. The text is only folded once per document,
+        # rows of the matches are computed when jumping to them, so they follow the current width.
+        self.__query = query
+        self.__matches = array('q')
+        if not query:
+            return 0
+
+        if self.__foldedText is None:
+            foldedText = self.__text.lower()
+            # Lowering a few characters changes their length, which would shift the offsets
+            self.__foldedText = foldedText if len(foldedText) == len(self.__text) else self.__text
+
+        text = self.__foldedText
+        query = query.lower() if text is not self.__text else query
+        offset = text.find(query)
+        while offset != -1:
+            self.__matches.append(offset)
+            offset = text.find(query, offset + 1)
+
+        return len(self.__matches)
+
+    def getQuery(self) -> str:
+        return self.__query
+
+    def numberOfMatches(self) -> int:
+        return len(self.__matches)
+
+    def matchRow(self, k) -> int:
+        offset = self.__matches[k]
+        line = bisect_right(self.__lineStarts, offset) - 1
+        self.__layOutLines(line + 1)
+        row = self.__layout[0][line] + self.__rowOfColumn(line, offset - self.__lineStarts[line])
+        # Blank lines have no rows, a match in one at the end of the document is shown on the last row
+        self.__layOutRows(row)
+        return min(row, max(0, self.__layout[1] - 1))
+
+    def __rowOfColumn(self, i, column):
+        # Returns the wrapped row of a line containing the column
+        if not self.__alwaysWrap[i] and self.__lineLengths[i] <= self.__width:
+            return 0
+
+        line = self.__line(i)
+        row = 0
+        position = 0
+        for j, wrappedLine in enumerate(self.__wrapLine(i, self.__width)):
+            found = line.find(wrappedLine, position)
+            if found == -1 or found > column:
+                break
+            row = j
+            position = found + len(wrappedLine)
+
+        return row
+
+    def findMatch(self, row, backwards=False):
+        # Returns the index of the first match after the row, or the last one before it, wrapping around at the end
+        # of the document. Matches are sorted by their rows, so they are found by a binary search.
+        n = len(self.__matches)
+        if not n:
+            return None
+
+        low, high = 0, n
+        while low < high:
+            middle = (low + high) // 2
+            matchRow = self.matchRow(middle)
+            if matchRow < row or (matchRow == row and not backwards):
+                low = middle + 1
+            else:
+                high = middle
+
+        return (low - 1) % n if backwards else low % n
 
     def getText(self) -> str:
         return self.__text
 
     def getNumberOfUnwrappedLines(self) -> int:
-        return self.__numeberOfUnwrappedLines
-
-
+        return len(self.__lineStarts)
@@ -0,0 +1,18 @@
+import os
+import tempfile
+from os import path
+
+
+def writeFileAtomically(filePath, content):
+    # The content is written to a temporary file in the same directory, which then replaces the target file.
+    # This way an interrupted write never leaves a partially written file behind. The mode of the file is kept.
+    mode = os.stat(filePath).st_mode if path.isfile(filePath) else 0o644
+    descriptor, temporaryPath = tempfile.mkstemp(dir=path.dirname(filePath) or '.', prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w') as file:
+            file.write(content)
+        os.chmod(temporaryPath, mode)
+        os.replace(temporaryPath, filePath)
+    except BaseException:
+        os.remove(temporaryPath)
+        raise
@@ -8,12 +8,23 @@ ESCAPE=27
 BACKSPACE=127
 SPACE=ord(' ')
 ENTER=ord('\n')
+SLASH=ord('/')
+PAGE_UP=curses.KEY_PPAGE
+PAGE_DOWN=curses.KEY_NPAGE
+HOME=curses.KEY_HOME
+END=curses.KEY_END
 
+A=ord('a')
+B=ord('b')
 F=ord('f')
+G=ord('g')
+I=ord('i')
 Q=ord('q')
 C=ord('c')
 D=ord('d')
 K=ord('k')
+N=ord('n')
+SHIFT_N=ord('N')
 R=ord('r')
 O=ord('o')
 S=ord('s')
@@ -21,4 +32,6 @@ T=ord('t')
 L=ord('l')
 U=ord('u')
 P=ord('p')
-E=ord('e')
\ No newline at end of file
+E=ord('e')
+W=ord('w')
+V=ord('v')
\ No newline at end of file
@@ -1,6 +1,7 @@
 import platform
 
-def main():
+def main(multiCluster=False, drift=False):
+    # The original actions come first, the legend is clipped at the width of the screen
     result = [
         ('[UP|DOWN]', ' Scrolling '),
         ('[L]', ' Reload List '),
@@ -13,6 +14,24 @@ def main():
         ('[P]', ' Pause '),
         ('[E]', ' Resume '),
         ('[T]', ' Tasks '),
+        ('[SPACE]', ' Mark '),
+        ('[A]', ' Mark All '),
+        ('[F]', ' Restart Failed '),
+        ('[W]', ' Watch '),
+        ('[/]', ' Filter '),
+        ('[B]', ' Sort '),
+        ('[G]', ' Group '),
+    ]
+
+    if multiCluster:
+        result.append(('[K]', ' Cluster '))
+
+    if drift:
+        result.append(('[V]', ' Drift '))
+
+    result += [
+        ('[I]', ' Stats '),
+        ('[ESC]', ' Cancel '),
     ]
 
     result.append(('[Q]', ' Quit '))
@@ -22,6 +41,10 @@ def document():
     result = [
         ('[UP]', ' Scroll up '),
         ('[DOWN]', ' Scroll down '),
+        ('[PGUP|PGDN]', ' Page '),
+        ('[HOME|END]', ' Top|End '),
+        ('[/]', ' Search '),
+        ('[N|SHIFT+N]', ' Next|Previous Match '),
         ('[L]', ' Toggle Line Numbers '),
         ('[O]', ' Open in System Editor ')
     ]
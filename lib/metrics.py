@@ -0,0 +1,274 @@
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Histogram:
+    # A thread safe histogram with cumulative buckets as used by Prometheus.
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.__counts = [0] * len(buckets)
+        self.__sum = 0.0
+        self.__count = 0
+        self.max = 0.0
+        self.__lock = threading.Lock()
+
+    def observe(self, value):
+        with self.__lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.__counts[i] += 1
+                    break
+            self.__sum += value
+            self.__count += 1
+            self.max = max(self.max, value)
+
+    def snapshot(self):
+        # Returns the cumulative counts of the buckets, the sum and the count of all observed values
+        with self.__lock:
+            cumulative = []
+            total = 0
+            for count in self.__counts:
+                total += count
+                cumulative.append(total)
+            return (cumulative, self.__sum, self.__count)
+
+    def quantile(self, q):
+        # Returns the upper bound of the bucket containing the quantile, or the maximum if it is beyond the last bucket
+        cumulative, _, count = self.snapshot()
+        if not count:
+            return None
+
+        for bound, bucketCount in zip(self.buckets, cumulative):
+            if bucketCount >= q * count:
+                return min(bound, self.max)
+
+        return self.max
+
+
+ENDPOINT_PATTERNS = [
+    (re.compile(r'^/connectors/[^/]+/tasks/[^/]+/'), '/connectors/{connector}/tasks/{task}/'),
+    (re.compile(r'^/connectors/[^/?]+'), '/connectors/{connector}'),
+]
+
+
+def endpointOf(path):
+    # Replaces connector names and task ids, so all requests to the same endpoint share their metrics
+    path = path.partition('?')[0]
+    for pattern, replacement in ENDPOINT_PATTERNS:
+        path, replaced = pattern.subn(replacement, path, count=1)
+        if replaced:
+            break
+
+    return path
+
+
+class EndpointStats:
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.bytes = 0
+
+
+class RequestMetrics:
+    # Observes the requests of ConnectClients, keeping a latency histogram and the number of received bytes
+    # per cluster, method, endpoint and status code.
+
+    def __init__(self):
+        self.__stats = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def observe(self, client, cluster):
+        client.observers.append(lambda method, path, status, seconds, size: self.record(cluster, method, path, status, seconds, size))
+
+    def record(self, cluster, method, path, status, seconds, size=0):
+        key = (cluster, method, endpointOf(path), str(status) if status else 'error')
+        with self.__lock:
+            stats = self.__stats.get(key)
+            if stats is None:
+                stats = self.__stats[key] = EndpointStats()
+            stats.bytes += size
+
+        stats.latency.observe(seconds)
+
+    def items(self):
+        with self.__lock:
+            return list(self.__stats.items())
+
+
+def escapeLabel(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def formatLabels(labels):
+    if not labels:
+        return ''
+
+    return '{%s}' % ','.join('%s="%s"' % (name, escapeLabel(value)) for name, value in labels.items())
+
+
+class MetricsWriter:
+    # Collects samples and renders them in the Prometheus text format, grouped by metric.
+
+    def __init__(self):
+        self.__metrics = OrderedDict()
+
+    def add(self, name, metricType, help, value, **labels):
+        metric = self.__metrics.setdefault(name, (metricType, help, []))
+        metric[2].append((labels, value))
+
+    def addHistogram(self, name, help, histogram, **labels):
+        cumulative, total, count = histogram.snapshot()
+        for bound, bucketCount in zip(histogram.buckets, cumulative):
+            self.add(name + '_bucket', 'histogram', help, bucketCount, **dict(labels, le='%g' % bound))
+        self.add(name + '_bucket', 'histogram', help, count, **dict(labels, le='+Inf'))
+        self.add(name + '_sum', 'histogram', help, total, **labels)
+        self.add(name + '_count', 'histogram', help, count, **labels)
+
+    def render(self):
+        lines = []
+        declared = set()
+        for name, (metricType, help, samples) in self.__metrics.items():
+            # The samples of a histogram are declared once by the name of the histogram
+            family = re.sub(r'_(bucket|sum|count)$', '', name) if metricType == 'histogram' else name
+            if family not in declared:
+                declared.add(family)
+                lines.append('# HELP %s %s' % (family, help))
+                lines.append('# TYPE %s %s' % (family, metricType))
+
+            for labels, value in samples:
+                lines.append('%s%s %s' % (name, formatLabels(labels), repr(value)))
+
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    # Polls the statuses of all connectors of the clusters in the background and serves the metrics of the
+    # last poll, so scrapes neither wait for nor put load on the clusters.
+
+    def __init__(self, apps, interval):
+        self.apps = apps
+        self.interval = interval
+        self.polls = Counter()
+        self.pollErrors = Counter()
+        self.__results = {app.cluster: None for app in apps}
+        self.__snapshot = self.render().encode('utf-8')
+
+    def getSnapshot(self):
+        return self.__snapshot
+
+    def poll(self):
+        # Clusters are polled in parallel, a failing cluster keeps the states of its last successful poll
+        with ThreadPoolExecutor(max_workers=len(self.apps)) as executor:
+            for app, result in zip(self.apps, executor.map(self.pollCluster, self.apps)):
+                self.polls[app.cluster] += 1
+                if result[0] is None:
+                    self.pollErrors[app.cluster] += 1
+                    previous = self.__results[app.cluster]
+                    result = (previous[0] if previous else None, result[1], False, time.time())
+                self.__results[app.cluster] = result
+
+        self.__snapshot = self.render().encode('utf-8')
+
+    def pollCluster(self, app):
+        start = time.perf_counter()
+        try:
+            statuses = app.getConnectorStatuses()
+        except Exception:
+            statuses = None
+
+        return (statuses, time.perf_counter() - start, statuses is not None, time.time())
+
+    def render(self):
+        writer = MetricsWriter()
+
+        for cluster, result in self.__results.items():
+            up = result is not None and result[2]
+            writer.add('kafka_connect_up', 'gauge', 'Whether the last poll of the cluster succeeded', 1 if up else 0, cluster=cluster)
+            if result is None:
+                continue
+
+            statuses, duration, _, timestamp = result
+            writer.add('kafka_connect_poll_duration_seconds', 'gauge', 'Duration of the last poll of the cluster', duration, cluster=cluster)
+            writer.add('kafka_connect_poll_timestamp_seconds', 'gauge', 'Time of the last poll of the cluster', timestamp, cluster=cluster)
+            writer.add('kafka_connect_polls_total', 'counter', 'Number of polls of the cluster', self.polls[cluster], cluster=cluster)
+            writer.add('kafka_connect_poll_errors_total', 'counter', 'Number of failed polls of the cluster', self.pollErrors[cluster], cluster=cluster)
+            if statuses is None:
+                continue
+
+            connectorStates = Counter()
+            connectorTypes = Counter()
+            connectorWorkers = Counter()
+            taskStates = Counter()
+            taskWorkers = Counter()
+            for status in statuses.values():
+                connectorStates[status['connector']['state']] += 1
+                connectorTypes[status.get('type')] += 1
+                connectorWorkers[status['connector'].get('worker_id')] += 1
+                for task in status['tasks']:
+                    taskStates[task['state']] += 1
+                    taskWorkers[task.get('worker_id')] += 1
+
+            for state, count in sorted(connectorStates.items()):
+                writer.add('kafka_connect_connectors', 'gauge', 'Number of connectors per state', count, cluster=cluster, state=state)
+            for type, count in sorted(connectorTypes.items(), key=lambda item: str(item[0])):
+                writer.add('kafka_connect_connectors_by_type', 'gauge', 'Number of connectors per type', count, cluster=cluster, type=type)
+            for worker, count in sorted(connectorWorkers.items(), key=lambda item: str(item[0])):
+                writer.add('kafka_connect_connectors_by_worker', 'gauge', 'Number of connectors per worker', count, cluster=cluster, worker=worker)
+            for state, count in sorted(taskStates.items()):
+                writer.add('kafka_connect_tasks', 'gauge', 'Number of tasks per state', count, cluster=cluster, state=state)
+            for worker, count in sorted(taskWorkers.items(), key=lambda item: str(item[0])):
+                writer.add('kafka_connect_tasks_by_worker', 'gauge', 'Number of tasks per worker', count, cluster=cluster, worker=worker)
+
+        for app in self.apps:
+            for (cluster, method, endpoint, status), stats in app.requests.items():
+                writer.addHistogram('kafka_connect_rest_request_duration_seconds', 'Latency of the requests to the REST interface', stats.latency,
+                                    cluster=cluster, method=method, endpoint=endpoint, code=status)
+                writer.add('kafka_connect_rest_response_bytes_total', 'counter', 'Size of the responses of the REST interface', stats.bytes,
+                           cluster=cluster, method=method, endpoint=endpoint, code=status)
+
+        return writer.render()
+
+    def pollForever(self, stop):
+        while not stop.is_set():
+            start = time.monotonic()
+            self.poll()
+            stop.wait(max(0, self.interval - (time.monotonic() - start)))
+
+    def serve(self, host, port):
+        # The request metrics of this module are used by all modes, the server only by this one
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.partition('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+
+                body = exporter.getSnapshot()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        stop = threading.Event()
+        poller = threading.Thread(target=self.pollForever, args=(stop,), daemon=True)
+        poller.start()
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        try:
+            server.serve_forever()
+        finally:
+            stop.set()
+            server.server_close()
@@ -0,0 +1,30 @@
+import threading
+import time
+from concurrent.futures import CancelledError
+
+
+class RateLimiter:
+    # A thread safe limiter spacing the calls of acquire() evenly, allowing at most rate calls per second.
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.__interval = 1.0 / rate
+        self.__next = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self, cancelled=None):
+        with self.__lock:
+            now = time.monotonic()
+            slot = max(now, self.__next)
+            self.__next = slot + self.__interval
+
+        delay = slot - now
+        if delay > 0:
+            if cancelled is not None:
+                if cancelled.wait(delay):
+                    raise CancelledError()
+            else:
+                time.sleep(delay)
+
+        if cancelled is not None and cancelled.is_set():
+            raise CancelledError()
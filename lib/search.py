@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    # Maps every trigram of the indexed texts to the positions of the texts containing it. Queries
+    # intersect the position sets of their trigrams and only verify the remaining candidates.
+
+    def __init__(self, texts=()):
+        self.__positions = defaultdict(set)
+        self.__texts = []
+        for text in texts:
+            self.__add(len(self.__texts), text.lower())
+            self.__texts.append(text.lower())
+
+    def __len__(self):
+        return len(self.__texts)
+
+    def __add(self, position, text):
+        for trigram in trigrams(text):
+            self.__positions[trigram].add(position)
+
+    def update(self, position, text):
+        text = text.lower()
+        previousText = self.__texts[position]
+        if previousText == text:
+            return
+
+        for trigram in trigrams(previousText):
+            positions = self.__positions[trigram]
+            positions.discard(position)
+            if not positions:
+                del self.__positions[trigram]
+
+        self.__texts[position] = text
+        self.__add(position, text)
+
+    def search(self, query, candidates=None):
+        # Returns the positions of the texts containing every word of the query. Candidates
+        # limit the search to the results of a previous, less specific query.
+        result = candidates
+        for word in sorted(query.lower().split(), key=len, reverse=True):
+            if len(word) >= 3:
+                for positions in sorted((self.__positions.get(trigram, ()) for trigram in trigrams(word)), key=len):
+                    result = set(positions) if result is None else result.intersection(positions)
+                    if not result:
+                        return set()
+
+                if len(word) == 3:
+                    continue
+
+            texts = self.__texts
+            if result is None:
+                result = {position for position, text in enumerate(texts) if word in text}
+            else:
+                result = {position for position in result if word in texts[position]}
+
+        return result if result is not None else set(range(len(self.__texts)))
@@ -0,0 +1,59 @@
+import hashlib
+import json
+import os
+import time
+from os import path
+
+from lib.connectors import Connector
+from lib.files import writeFileAtomically
+
+
+class SnapshotStore:
+    # Keeps the last loaded connectors of every cluster URL in a file of its own, so the interactive mode can show
+    # them before the cluster answered. Connectors are stored as rows without field names, the cluster is left out
+    # as its name depends on the command line. Snapshots are a cache: unreadable ones are ignored, failed writes too.
+
+    VERSION = 1
+    # The cluster is the last field of a connector, all others are stored in their order
+    FIELDS = list(Connector._fields[:-1])
+
+    def __init__(self, directory=None):
+        self.directory = directory if directory else self.defaultDirectory()
+
+    @staticmethod
+    def defaultDirectory():
+        cacheHome = os.environ.get('XDG_CACHE_HOME') or path.join(path.expanduser('~'), '.cache')
+        return path.join(cacheHome, 'confluent-connect', 'snapshots')
+
+    def filePath(self, url):
+        return path.join(self.directory, '%s.json' % hashlib.sha256(url.encode('utf-8')).hexdigest()[:32])
+
+    def load(self, url, cluster=None):
+        # Returns the connectors and the time of the snapshot, or None if there is no usable snapshot
+        try:
+            with open(self.filePath(url)) as file:
+                content = json.load(file)
+
+            if content.get('version') != self.VERSION or content.get('url') != url or content.get('fields') != self.FIELDS:
+                return None
+
+            create = Connector.create
+            return ([create(*row, cluster) for row in content['rows']], content['timestamp'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, url, connectors):
+        content = {
+            'version': self.VERSION,
+            'url': url,
+            'timestamp': time.time(),
+            'fields': self.FIELDS,
+            'rows': [connector[:-1] for connector in connectors]
+        }
+
+        # Written to a temporary file first, so a concurrent start never reads a partial snapshot
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            writeFileAtomically(self.filePath(url), json.dumps(content, separators=(',', ':')))
+        except OSError:
+            pass
@@ -0,0 +1,31 @@
+import json
+import threading
+import time
+
+from lib.metrics import endpointOf
+
+
+class Tracer:
+    # Writes spans as JSON lines to a file for offline analysis. Spans can be written from any thread.
+
+    def __init__(self, file):
+        self.file = file
+        self.__lock = threading.Lock()
+
+    def span(self, kind, name, start, duration, **attributes):
+        line = json.dumps(dict(attributes, kind=kind, name=name, start=start, duration=duration))
+        with self.__lock:
+            self.file.write(line + '\n')
+            self.file.flush()
+
+    def observe(self, client, cluster):
+        def onRequest(method, path, status, seconds, size):
+            # The start is derived from the end of the request, which is when observers are called
+            self.span('request', '%s %s' % (method, endpointOf(path)), time.time() - seconds, seconds,
+                      cluster=cluster, path=path, status=status, bytes=size)
+
+        client.observers.append(onRequest)
+
+    def close(self):
+        with self.__lock:
+            self.file.close()
@@ -1,5 +1,8 @@
 import subprocess
 import platform
+import time
+from collections import OrderedDict
+from functools import partial
 
 from gupy.geometry import Padding
 from gupy.view import BackgroundView, Label, HBox, ListView, ListViewDelegate, View
@@ -7,8 +10,15 @@ from gupy.screen import ConstrainedBasedScreen
 from enum import Enum
 import curses
 
+from concurrent.futures import CancelledError
+
 from lib import colorpairs, legends, keys
+from lib.connectors import GROUP_KEYS, SORT_KEYS, Connector, ConnectorGroup, ConnectorStore
+from lib.connectorview import ConnectorView
+from lib.bulk import BulkProgress
 from lib.document import Document
+from lib.metrics import Histogram
+from lib.worker import BackgroundWorker
 
 
 class Mode(Enum):
@@ -27,6 +37,7 @@ class UI(ListViewDelegate):
     WORKER_ID_FORMAT = '{:<21}'
     TYPE_FORMAT = '{:<7}'
     TASKS_FORMAT = '{:<6}'
+    DRIFT_FORMAT = '{:<9}'
 
     MAX_TOPIC_LENGTH = 60
     TOPIC_FORMAT = '{:<' + str(MAX_TOPIC_LENGTH) + '}'
@@ -35,7 +46,9 @@ class UI(ListViewDelegate):
         'UNASSIGNED': colorpairs.UNASSIGNED,
         'RUNNING': colorpairs.RUNNING,
         'PAUSED': colorpairs.PAUSED,
-        'FAILED': colorpairs.FAILED
+        'FAILED': colorpairs.FAILED,
+        'RESTARTING': colorpairs.UNASSIGNED,
+        'STOPPED': colorpairs.PAUSED
     }
 
     TYPE_COLORS = {
@@ -43,8 +56,33 @@ class UI(ListViewDelegate):
         'sink': colorpairs.SINK
     }
 
-    def __init__(self, app):
-        self.app = app
+    DRIFT_COLORS = {
+        'in-sync': colorpairs.RUNNING,
+        'drifted': colorpairs.FAILED,
+        'untracked': colorpairs.PAUSED,
+        'error': colorpairs.FAILED
+    }
+
+    POLL_INTERVAL_MS = 100
+    LAYOUT_SECONDS = 0.02
+    MAX_CACHED_ROWS = 512
+    DEFAULT_WATCH_INTERVAL = 5
+    TIMING_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+    STATS_FORMAT = ' {:<48} {:>6} {:>8} {:>8} {:>8} {:>9} '
+
+    ACTIONS = {
+        keys.R: ('Restarting', 'restartConnector'),
+        keys.P: ('Pausing', 'pauseConnector'),
+        keys.E: ('Resuming', 'resumeConnector'),
+        keys.F: ('Restarting failed tasks of', 'restartFailedTasks')
+    }
+
+    def __init__(self, apps):
+        # The connectors of all clusters are shown in one list, cluster specific requests go to the app of their cluster
+        self.apps = OrderedDict((app.cluster, app) for app in apps)
+        self.app = apps[0]
+        self.__rowCache = OrderedDict()
+        self.__timings = OrderedDict()
 
     def setupColors(self):
         curses.curs_set(0)
@@ -95,7 +133,7 @@ class UI(ListViewDelegate):
         background = BackgroundView(curses.color_pair(colorpairs.HEADER_TEXT))
         screen.add_view(background, lambda w, h, v: (0, 0, w, 2))
 
-        hostLabel = Label(self.app.host)
+        hostLabel = Label(self.app.host if len(self.apps) == 1 else '%d clusters' % len(self.apps))
         hostLabel.attributes.append(curses.color_pair(colorpairs.HEADER_TEXT))
         hostLabel.attributes.append(curses.A_BOLD)
 
@@ -104,12 +142,17 @@ class UI(ListViewDelegate):
         screen.add_view(title_hbox, lambda w, h, v: (
         (w - v.required_size().width) // 2, 0, title_hbox.required_size().width + 1, 1))
 
+        screen.add_view(self.__activityLabel, lambda w, h, v: (
+            w - v.required_size().width - 1, 0, v.required_size().width, 1))
+
+        screen.add_view(self.__viewLabel, lambda w, h, v: (1, 0, v.required_size().width, 1))
+
         if self.__mode == Mode.CONNECTORS:
             subtitleBox, moreLabel = self.addColumnNames(screen)
-            return (background, title_hbox, subtitleBox, moreLabel)
+            return (background, title_hbox, self.__activityLabel, self.__viewLabel, subtitleBox, moreLabel)
         else:
             subtitle_hbox = self.addDocumentName(screen)
-            return (background, title_hbox, subtitle_hbox)
+            return (background, title_hbox, self.__activityLabel, self.__viewLabel, subtitle_hbox)
 
     def addDocumentName(self, screen):
         moreLabel = Label('')
@@ -145,10 +188,16 @@ class UI(ListViewDelegate):
         box = HBox()
         box.clipping_callback = setMoreLabel
 
+        if self.isMultiCluster():
+            clusterLabel = Label(self.__clusterFormat.format('CLUSTER'))
+            clusterLabel.attributes.append(curses.color_pair(colorpairs.DESCRIPTION))
+            clusterLabel.attributes.append(curses.A_BOLD)
+            box.add_view(clusterLabel, Padding(1, 0, 0, 0))
+
         stateLabel = Label(self.STATE_FORMAT.format('STATE'))
         stateLabel.attributes.append(curses.color_pair(colorpairs.DESCRIPTION))
         stateLabel.attributes.append(curses.A_BOLD)
-        box.add_view(stateLabel, Padding(1, 0, 0, 0))
+        box.add_view(stateLabel, Padding(2 if self.isMultiCluster() else 1, 0, 0, 0))
 
         workerIdLabel = Label(self.WORKER_ID_FORMAT.format('WORKER_ID'))
         workerIdLabel.attributes.append(curses.color_pair(colorpairs.DESCRIPTION))
@@ -170,6 +219,12 @@ class UI(ListViewDelegate):
         tasksLabel.attributes.append(curses.A_BOLD)
         box.add_view(tasksLabel, Padding(2, 0, 0, 0))
 
+        if self.showsDrift():
+            driftLabel = Label(self.DRIFT_FORMAT.format('DRIFT'))
+            driftLabel.attributes.append(curses.color_pair(colorpairs.DESCRIPTION))
+            driftLabel.attributes.append(curses.A_BOLD)
+            box.add_view(driftLabel, Padding(2, 0, 0, 0))
+
         nameLabel = Label('NAME')
         nameLabel.attributes.append(curses.color_pair(colorpairs.DESCRIPTION))
         nameLabel.attributes.append(curses.A_BOLD)
@@ -233,33 +288,88 @@ class UI(ListViewDelegate):
         label.text = clippedValue
 
     def buildConnectorRow(self, i, data, is_selected, width) -> View:
+        # Rows are cached by their content, so changed data never hits a stale row and
+        # moving the selection only rebuilds the previously and the newly selected row.
+        marked = isinstance(data, Connector) and data.key() in self.__marked
+        drift = self.__drift.get(data.key())[0] if isinstance(data, Connector) and data.key() in self.__drift else None
+        key = (data, is_selected, marked, drift, width)
+        row = self.__rowCache.get(key)
+        if row is not None:
+            self.__rowCache.move_to_end(key)
+            return row
+
+        if isinstance(data, ConnectorGroup):
+            row = self.createGroupRow(data, is_selected)
+        else:
+            row = self.createConnectorRow(data, is_selected, marked, drift)
+        self.__rowCache[key] = row
+        if len(self.__rowCache) > self.MAX_CACHED_ROWS:
+            self.__rowCache.popitem(last=False)
+
+        return row
+
+    def createGroupRow(self, group, is_selected) -> View:
         rowHBox = HBox()
 
-        state, type, workerId, tasks, topic, name = data
+        groupLabel = Label('%s (%d)' % (group.label(), group.count))
+        groupLabel.attributes.append(curses.color_pair(colorpairs.DESCRIPTION))
+        groupLabel.attributes.append(curses.A_BOLD)
+        rowHBox.add_view(groupLabel, Padding(1, 0, 0, 0))
 
-        stateLabel = Label(self.STATE_FORMAT.format(state))
-        stateLabel.attributes.append(curses.color_pair(self.STATE_COLORS[state]))
+        result = rowHBox
+        if is_selected:
+            result = BackgroundView(curses.color_pair(colorpairs.SELECTED))
+            result.add_view(rowHBox)
+            groupLabel.attributes.append(curses.color_pair(colorpairs.SELECTED))
+
+        return result
+
+    def createConnectorRow(self, data, is_selected, marked=False, drift=None) -> View:
+        rowHBox = HBox()
+
+        # Marked connectors are flagged in the first column, which is otherwise left empty
+        markLabel = Label('*' if marked else ' ')
+        markLabel.attributes.append(curses.A_BOLD)
+        rowHBox.add_view(markLabel, Padding(0, 0, 0, 0))
+
+        topic = data.topic
+
+        stateLabel = Label(self.STATE_FORMAT.format(data.state))
+        stateLabel.attributes.append(curses.color_pair(self.STATE_COLORS.get(data.state, colorpairs.DEFAULT)))
         stateLabel.attributes.append(curses.A_BOLD)
 
-        workerIdLabel = Label(self.WORKER_ID_FORMAT.format(workerId))
+        workerIdLabel = Label(self.WORKER_ID_FORMAT.format(data.workerId))
 
-        typeLabel = Label(self.TYPE_FORMAT.format(type))
-        typeLabel.attributes.append(curses.color_pair(self.TYPE_COLORS[type]))
+        typeLabel = Label(self.TYPE_FORMAT.format(data.type))
+        typeLabel.attributes.append(curses.color_pair(self.TYPE_COLORS.get(data.type, colorpairs.DEFAULT)))
         typeLabel.attributes.append(curses.A_BOLD)
 
-        tasksLabel = Label(self.TASKS_FORMAT.format(tasks))
+        tasksLabel = Label(self.TASKS_FORMAT.format(data.tasks))
 
         if topic and len(topic) > self.MAX_TOPIC_LENGTH:
             topic = topic[0:self.MAX_TOPIC_LENGTH-3] + '...'
         topicLabel = Label(self.TOPIC_FORMAT.format(topic if topic else ''))
 
-        nameLabel = Label(name)
+        nameLabel = Label(data.name)
+
+        if self.isMultiCluster():
+            clusterLabel = Label(self.__clusterFormat.format(data.cluster))
+            clusterLabel.attributes.append(curses.A_BOLD)
+            rowHBox.add_view(clusterLabel, Padding(0, 0, 0, 0))
 
-        rowHBox.add_view(stateLabel, Padding(1, 0, 0, 0))
+        rowHBox.add_view(stateLabel, Padding(2 if self.isMultiCluster() else 0, 0, 0, 0))
         rowHBox.add_view(workerIdLabel, Padding(2, 0, 0, 0))
         rowHBox.add_view(typeLabel, Padding(2, 0, 0, 0))
         rowHBox.add_view(topicLabel, Padding(2, 0, 0, 0))
         rowHBox.add_view(tasksLabel, Padding(2, 0, 0, 0))
+
+        if self.showsDrift():
+            driftLabel = Label(self.DRIFT_FORMAT.format(drift or ''))
+            if drift in self.DRIFT_COLORS:
+                driftLabel.attributes.append(curses.color_pair(self.DRIFT_COLORS[drift]))
+            driftLabel.attributes.append(curses.A_BOLD)
+            rowHBox.add_view(driftLabel, Padding(2, 0, 0, 0))
+
         rowHBox.add_view(nameLabel, Padding(2, 0, 0, 0))
 
         result = rowHBox
@@ -271,11 +381,14 @@ class UI(ListViewDelegate):
 
         return result
 
-    def switchToDocument(self, document: Document, connector: str, view: str):
+    def switchToDocument(self, document: Document, title: str, view: str):
         self.__mode = Mode.DOCUMENT
-        self.__connectorName = connector
+        self.__connectorName = title
         self.__view = view
         self.__document = document
+        self.__editingSearch = False
+        self.__searchQuery = ''
+        self.__match = None
 
         self.__screen.remove_view(self.__connectorsListView)
         self.__documentListView = self.createListView(self.__screen, document)
@@ -290,10 +403,11 @@ class UI(ListViewDelegate):
         self.__mode = Mode.CONNECTORS
 
         self.__screen.remove_view(self.__documentListView)
-        self.addListView(self.__screen, self.__connectorsListView)
+        if not self.__reloading:
+            self.addListView(self.__screen, self.__connectorsListView)
 
         self.__screen.remove_views(self.__legendElements)
-        self.__legendElements = self.addLegend(self.__screen, legends.main())
+        self.__legendElements = self.addLegend(self.__screen, legends.main(self.isMultiCluster(), self.showsDrift()))
 
         self.__screen.remove_views(self.__headerElements)
         self.__headerElements = self.addHeaderBox(self.__screen)
@@ -301,12 +415,85 @@ class UI(ListViewDelegate):
     def isMacOs(self):
         return platform.system() == 'Darwin'
 
+    def isMultiCluster(self):
+        return len(self.apps) > 1
+
+    def showsDrift(self):
+        return any(app.driftDirectory for app in self.apps.values())
+
+    def appOf(self, connector):
+        return self.apps[connector.cluster]
+
+    def connectorLabel(self, connector):
+        return '%s@%s' % (connector.name, connector.cluster) if self.isMultiCluster() else connector.name
+
     def reloadConnectors(self):
-        self.app.refreshConnectors(onBegin=self.onReloadBegin,
-                                   onFetchComplete=self.onFetchComplete,
-                                   onLoadingBegin=self.onConnectorLoadingBegin,
-                                   onClomplete=self.onReloadComplete)
-        self.render()
+        if self.__reloading or self.__loadingClusters:
+            return
+
+        # Every cluster is fetched by an operation of its own. The list is shown once the first cluster is loaded,
+        # the connectors of the other clusters are merged into it as they arrive.
+        self.__reloading = True
+        self.__loadingClusters = set(self.apps)
+        self.__generation += 1
+        self.onReloadBegin()
+
+        for app in self.apps.values():
+            description = "Reloading connectors of '%s'" % app.cluster if self.isMultiCluster() else 'Reloading connectors'
+            self.__worker.submit(description, partial(self.fetchConnectors, app),
+                                 onSuccess=partial(self.onReloadComplete, app), onFailure=partial(self.onReloadFailed, app))
+
+    def loadConnectors(self):
+        snapshots = OrderedDict((cluster, app.loadSnapshot()) for cluster, app in self.apps.items())
+        if any(snapshots.values()):
+            self.revalidateConnectors(snapshots)
+        else:
+            self.reloadConnectors()
+
+    def revalidateConnectors(self, snapshots):
+        # The connectors of the last run are shown right away and marked stale. Their clusters are then synced like in
+        # watch mode, so only the connectors that changed since are loaded. Clusters without snapshot are loaded completely.
+        self.__loadingClusters = set(self.apps)
+        self.__generation += 1
+        generation = self.__generation
+
+        for cluster, snapshot in snapshots.items():
+            if snapshot:
+                connectors, timestamp = snapshot
+                self.__connectors.setCluster(cluster, connectors)
+                self.__staleClusters[cluster] = timestamp
+
+        for app in self.apps.values():
+            if app.cluster in self.__staleClusters:
+                description = "Revalidating connectors of '%s'" % app.cluster if self.isMultiCluster() else 'Revalidating connectors'
+                self.__worker.submit(description, partial(self.fetchConnectorChanges, app, snapshots[app.cluster][0], alwaysSave=True),
+                                     onSuccess=partial(self.onRevalidateComplete, generation, app), onFailure=partial(self.onReloadFailed, app))
+            else:
+                description = "Loading connectors of '%s'" % app.cluster
+                self.__worker.submit(description, partial(self.fetchConnectors, app),
+                                     onSuccess=partial(self.onReloadComplete, app), onFailure=partial(self.onReloadFailed, app))
+
+    def onRevalidateComplete(self, generation, app, changes):
+        self.__staleClusters.pop(app.cluster, None)
+
+        changed, removed = changes
+        if generation == self.__generation and (changed or removed):
+            self.changeView(lambda: self.__connectors.apply(changed, removed))
+        self.finishReload(app)
+
+    def fetchConnectors(self, app, operation):
+        failures = []
+        connectors = app.fetchConnectors(onFetchComplete=lambda connectorIds: self.__worker.post(self.onFetchComplete, connectorIds),
+                                         onLoadingBegin=lambda i, n, connectorId: self.__worker.post(self.onConnectorLoadingBegin, i, n, connectorId),
+                                         cancelled=operation.cancelled,
+                                         onFailed=lambda connectorId, error: failures.append((connectorId, error)))
+        if not failures:
+            app.saveSnapshot(connectors)
+
+        # The search index is built here, so filtering is instant once the list is shown. The connectors of several
+        # clusters are merged into one store, whose search index is only built once it is needed.
+        connectors = ConnectorStore.sort(connectors)
+        return (connectors, ConnectorStore.createSearchIndex(connectors) if not self.isMultiCluster() else None, failures)
 
     def onReloadBegin(self):
         self.hideConnectorsList()
@@ -320,17 +507,430 @@ class UI(ListViewDelegate):
             self.__maxConnectorIdLength = len(max(connectorIds, key=len))
 
     def onConnectorLoadingBegin(self, i, n, connectorId):
+        # The progress is only shown while the list is hidden
+        if not self.__reloading:
+            return
+
         connectorFormat = '{:<%d}' % self.__maxConnectorIdLength
         connector = connectorFormat.format("'"+connectorId+"'")
         status = '(%s|%s) Loading Connector %s' % (i, n, connector)
         self.updateApiInteractionStatusLabel(status)
         self.render()
 
-    def onReloadComplete(self):
-        self.removeApiInteractionStatusLabel()
-        self.showConnectorsList()
+    def onReloadComplete(self, app, result):
+        connectors, searchIndex, failures = result
+        self.__staleClusters.pop(app.cluster, None)
+        if failures:
+            # Connectors which failed to load keep their previous state instead of disappearing from the list
+            stale = [self.__connectors.get((app.cluster, connectorId)) for connectorId, _ in failures]
+            stale = [connector for connector in stale if connector is not None]
+            if stale:
+                connectors = ConnectorStore.sort(connectors + stale)
+                searchIndex = None
+            self.onConnectorsFailed(app, failures)
+
+        if not self.__reloading:
+            self.changeView(lambda: self.__connectors.setCluster(app.cluster, connectors, searchIndex))
+        else:
+            self.__rowCache.clear()
+            self.__connectors.setCluster(app.cluster, connectors, searchIndex)
+            self.clampSelection()
+        self.finishReload(app)
+
+    def onReloadFailed(self, app, error):
+        # The connectors of an unreachable cluster are kept, the other clusters are shown anyway
+        self.onOperationFailed(error, app)
+        self.finishReload(app)
+
+    def finishReload(self, app):
+        self.__loadingClusters.discard(app.cluster)
+        if not self.__loadingClusters:
+            self.__lastSync = time.monotonic()
+            self.compareWithBackups()
+
+        if self.__reloading:
+            self.__reloading = False
+            self.removeApiInteractionStatusLabel()
+            if self.__mode == Mode.CONNECTORS:
+                self.showConnectorsList()
         self.render()
 
+    def compareWithBackups(self):
+        for app in self.apps.values():
+            if app.driftDirectory:
+                self.__worker.submit('Comparing configs with the backup', partial(self.detectDrift, app),
+                                     onSuccess=partial(self.onDriftDetected, app), onFailure=partial(self.onOperationFailed, app=app))
+
+    def detectDrift(self, app, operation):
+        return app.detectDrift(app.driftDirectory, operation.cancelled)
+
+    def onDriftDetected(self, app, results):
+        for key in [key for key in self.__drift if key[0] == app.cluster]:
+            del self.__drift[key]
+        for name, result in results.items():
+            self.__drift[(app.cluster, name)] = result
+
+    def openDriftDocument(self, connector):
+        state, diff, error = self.__drift.get(connector.key(), (None, [], None))
+        if state is None:
+            lines = ['The config has not been compared with the backup yet']
+        elif state == 'drifted':
+            lines = ['The config differs from the backup:', '']
+            lines += [self.appOf(connector).formatConfigDiff(key, old, new) for key, old, new in diff]
+        elif state == 'untracked':
+            lines = ['The backup contains no config of this connector']
+        elif state == 'error':
+            lines = ['The config could not be compared with the backup: %s' % error]
+        else:
+            lines = ['The config matches the backup']
+
+        self.switchToDocument(Document('\n'.join(lines)), self.connectorLabel(connector), 'Drift')
+
+    def clampSelection(self):
+        while self.__connectorsListView.get_selected_row_index() >= self.__connectorsView.number_of_rows() > 0:
+            self.__connectorsListView.select_previous()
+
+    def toggleWatch(self):
+        self.__watching = not self.__watching
+        self.__lastSync = time.monotonic()
+
+    def syncConnectorsIfDue(self):
+        if not self.__watching or self.__syncingClusters or self.__reloading or self.__loadingClusters:
+            return False
+
+        if time.monotonic() - self.__lastSync < self.__watchInterval:
+            return False
+
+        # Clusters are synced independently, so a slow cluster does not delay the updates of the others
+        self.__syncingClusters = set(self.apps)
+        generation = self.__generation
+        connectors = self.__connectors
+
+        for app in self.apps.values():
+            current = [connector for connector in connectors if connector.cluster == app.cluster]
+            description = "Updating connectors of '%s'" % app.cluster if self.isMultiCluster() else 'Updating connectors'
+            self.__worker.submit(description, partial(self.fetchConnectorChanges, app, current),
+                                 onSuccess=partial(self.onSyncComplete, generation, app), onFailure=partial(self.onSyncFailed, app))
+        return True
+
+    def fetchConnectorChanges(self, app, connectors, operation, alwaysSave=False):
+        failures = []
+        changes = app.fetchConnectorChanges(connectors, operation.cancelled, lambda connectorId, error: failures.append((connectorId, error)))
+        if failures:
+            self.__worker.post(self.onConnectorsFailed, app, failures)
+        elif alwaysSave or changes[0] or changes[1]:
+            app.saveSnapshot(self.mergeChanges(connectors, *changes))
+        return changes
+
+    @staticmethod
+    def mergeChanges(connectors, changed, removed):
+        replaced = set(removed) | set(connector.key() for connector in changed)
+        return [connector for connector in connectors if connector.key() not in replaced] + list(changed)
+
+    def onSyncComplete(self, generation, app, changes):
+        self.finishSync(app)
+        self.__staleClusters.pop(app.cluster, None)
+
+        changed, removed = changes
+        if generation != self.__generation or not (changed or removed):
+            return
+
+        self.changeView(lambda: self.__connectors.apply(changed, removed))
+
+    def onSyncFailed(self, app, error):
+        self.finishSync(app)
+        self.onOperationFailed(error, app)
+
+    def finishSync(self, app):
+        self.__syncingClusters.discard(app.cluster)
+        if not self.__syncingClusters:
+            self.__lastSync = time.monotonic()
+
+    def selectRow(self, listView, index):
+        while listView.get_selected_row_index() < index:
+            listView.select_next()
+
+        while listView.get_selected_row_index() > index:
+            listView.select_previous()
+
+    def onIdle(self):
+        scheduled = self.syncConnectorsIfDue()
+        processed = self.__worker.processPending()
+
+        # The rest of a document is laid out while waiting for keys, no rows change on screen
+        if self.__mode == Mode.DOCUMENT and self.__document:
+            self.__document.continueLayout(self.LAYOUT_SECONDS)
+
+        return scheduled or processed
+
+    def setFilter(self, query):
+        self.changeView(lambda: self.__connectorsView.setQuery(query))
+
+    def cycleSortBy(self):
+        self.changeView(lambda: self.__connectorsView.setSortBy(self.nextKey(SORT_KEYS, self.__connectorsView.sortBy)))
+
+    def cycleGroupBy(self):
+        self.changeView(lambda: self.__connectorsView.setGroupBy(self.nextKey(GROUP_KEYS, self.__connectorsView.groupBy)))
+
+    def cycleCluster(self):
+        self.changeView(lambda: self.__connectorsView.setCluster(self.nextKey([None] + list(self.apps), self.__connectorsView.cluster)))
+
+    def nextKey(self, keys, current):
+        keys = list(keys)
+        return keys[(keys.index(current) + 1) % len(keys)]
+
+    def changeView(self, change):
+        # Keeps the selected connector selected
+        selectedConnector = self.getSelectedConnector()
+        change()
+        self.clampSelection()
+
+        index = self.__connectorsView.indexOf(selectedConnector.key()) if selectedConnector else None
+        if index is not None:
+            self.selectRow(self.__connectorsListView, index)
+
+    def updateViewLabel(self):
+        if self.__mode == Mode.DOCUMENT:
+            self.__viewLabel.text = self.getSearchText()
+            return
+
+        view = self.__connectorsView
+        text = ''
+        if self.__staleClusters:
+            age = self.formatAge(time.time() - min(self.__staleClusters.values()))
+            if self.isMultiCluster():
+                text += ' Stale: %s (%s old) ' % (', '.join(self.__staleClusters), age)
+            else:
+                text += ' Stale (%s old) ' % age
+        if self.__marked:
+            text += ' Marked: %d ' % len(self.__marked)
+        if view.cluster is not None:
+            text += ' Cluster: %s ' % view.cluster
+        if view.sortBy != 'name':
+            text += ' Sort: %s ' % view.sortBy
+        if view.groupBy != 'none':
+            text += ' Group: %s ' % view.groupBy
+
+        if self.__editingFilter:
+            text += ' /%s_ ' % view.query
+        elif view.query:
+            text += ' /%s (%d) ' % (view.query, view.number_of_rows())
+
+        self.__viewLabel.text = text
+
+    @staticmethod
+    def formatAge(seconds):
+        for unit, length in (('d', 86400), ('h', 3600), ('m', 60)):
+            if seconds >= length:
+                return '%d%s' % (seconds // length, unit)
+        return '%ds' % max(0, seconds)
+
+    def handleFilterKey(self, key):
+        query = self.__connectorsView.query
+
+        if key == keys.ESCAPE:
+            self.__editingFilter = False
+            self.setFilter('')
+
+        elif key in (keys.ENTER, curses.KEY_ENTER):
+            self.__editingFilter = False
+
+        elif key in (keys.BACKSPACE, curses.KEY_BACKSPACE, 8):
+            self.setFilter(query[:-1])
+
+        elif 32 <= key < 127:
+            self.setFilter(query + chr(key))
+
+    def getSearchText(self):
+        query = self.__document.getQuery()
+        if self.__editingSearch:
+            return ' /%s_ ' % self.__searchQuery
+        elif not query:
+            return ''
+        elif self.__match is None:
+            return ' /%s (not found) ' % query
+        else:
+            return ' /%s (%d|%d) ' % (query, self.__match + 1, self.__document.numberOfMatches())
+
+    def handleSearchKey(self, key):
+        query = self.__searchQuery
+
+        if key == keys.ESCAPE:
+            self.__editingSearch = False
+            self.__match = None
+            self.__document.search('')
+
+        elif key in (keys.ENTER, curses.KEY_ENTER):
+            # Matches are only searched once the query is complete, the first one is the next from the selected row on
+            self.__editingSearch = False
+            self.__document.search(query)
+            self.jumpToMatch(self.__documentListView.get_selected_row_index() - 1)
+
+        elif key in (keys.BACKSPACE, curses.KEY_BACKSPACE, 8):
+            self.__searchQuery = query[:-1]
+
+        elif 32 <= key < 127:
+            self.__searchQuery = query + chr(key)
+
+    def jumpToMatch(self, row, backwards=False):
+        self.__match = self.__document.findMatch(row, backwards)
+        if self.__match is not None:
+            self.jumpToRow(self.__document.matchRow(self.__match))
+
+    def jumpToRow(self, row):
+        self.__document.layOut(row)
+        self.selectRow(self.__documentListView, max(0, min(row, self.__document.number_of_rows() - 1)))
+
+    def pageSize(self):
+        # The list takes the whole screen except the header and the legend
+        height, _ = self.__screen.get_screen_size()
+        return max(1, height - 3)
+
+    def getSelectedConnector(self):
+        if self.__reloading or self.__connectorsView.number_of_rows() == 0:
+            return None
+
+        connector = self.__connectorsView.get_data(self.__connectorsListView.get_selected_row_index())
+        return connector if isinstance(connector, Connector) else None
+
+    def openConnectorDocument(self, connector, view, request):
+        def onSuccess(jsonContent):
+            if self.__mode == Mode.CONNECTORS:
+                document = Document(self.app.prettyfyJson(jsonContent))
+                self.switchToDocument(document, self.connectorLabel(connector), view)
+
+        self.__worker.submit("Fetching %s of '%s'" % (view.lower(), self.connectorLabel(connector)), lambda operation: request(connector.name),
+                             onSuccess=onSuccess, onFailure=self.onOperationFailed)
+
+    def performConnectorAction(self, connector, description, action):
+        def perform(operation):
+            action(connector.name)
+            return self.appOf(connector).getConnector(connector.name)
+
+        self.__worker.submit("%s '%s'" % (description, self.connectorLabel(connector)), perform,
+                             onSuccess=self.__connectors.replace, onFailure=self.onOperationFailed)
+
+    def toggleMark(self):
+        connector = self.getSelectedConnector()
+        if connector:
+            self.__marked.symmetric_difference_update([connector.key()])
+            self.__connectorsListView.select_next()
+
+    def markShown(self):
+        # Marks all connectors matching the current filter, or unmarks them if they are all marked already
+        view = self.__connectorsView
+        shown = [connector.key() for connector in (view.get_data(i) for i in range(view.number_of_rows())) if isinstance(connector, Connector)]
+        if all(key in self.__marked for key in shown):
+            self.__marked.difference_update(shown)
+        else:
+            self.__marked.update(shown)
+
+    def getMarkedConnectors(self):
+        connectors = (self.__connectors.get(key) for key in self.__marked)
+        return [connector for connector in connectors if connector is not None]
+
+    def performBulkAction(self, description, action):
+        # Performs the action on all marked connectors
+        connectors = self.getMarkedConnectors()
+        if not connectors or self.__bulkProgress is not None:
+            return
+
+        def perform(app, onPerformed, cancelled):
+            names = sorted(connector.name for connector in connectors if connector.cluster == app.cluster)
+            app.performBulkAction(app.bulkAction(action), names, onPerformed, cancelled)
+
+        progress = BulkProgress('%s %d connectors' % (description, len(connectors)), connectors)
+        self.runBulkAction(progress, {connector.cluster for connector in connectors}, perform)
+
+    def restartAllFailedTasks(self):
+        # Restarts the failed connectors and tasks of all shown clusters, which are only known once their status is fetched
+        if self.__bulkProgress is not None:
+            return
+
+        progress = BulkProgress('Restarting failed tasks')
+
+        def perform(app, onPerformed, cancelled):
+            app.restartAllFailedTasks(lambda connectors: self.__worker.post(progress.addConnectors, connectors), onPerformed, cancelled)
+
+        clusters = [self.__connectorsView.cluster] if self.__connectorsView.cluster is not None else list(self.apps)
+        self.runBulkAction(progress, clusters, perform)
+
+    def runBulkAction(self, progress, clusters, perform):
+        # Every cluster runs its actions in parallel and refreshes the status of its connectors
+        # once all actions are done, instead of once per connector.
+        self.__bulkProgress = progress
+        self.__bulkClusters = set(clusters)
+        generation = self.__generation
+
+        for cluster in clusters:
+            app = self.apps[cluster]
+            current = [connector for connector in self.__connectors if connector.cluster == cluster]
+            self.__worker.submit(progress.description, partial(self.performActions, app, perform, current),
+                                 onSuccess=partial(self.onBulkActionComplete, generation, app),
+                                 onFailure=partial(self.onBulkActionFailed, app))
+
+    def performActions(self, app, perform, connectors, operation):
+        def onPerformed(name, error):
+            self.__worker.post(self.onConnectorActionPerformed, (app.cluster, name), error)
+
+        perform(app, onPerformed, operation.cancelled)
+        return self.fetchConnectorChanges(app, connectors, operation)
+
+    def onConnectorActionPerformed(self, key, error):
+        self.__bulkProgress.add(key, error)
+        if not error:
+            self.__marked.discard(key)
+
+    def onBulkActionComplete(self, generation, app, changes):
+        changed, removed = changes
+        if generation == self.__generation and (changed or removed):
+            self.changeView(lambda: self.__connectors.apply(changed, removed))
+        self.finishBulkAction(app)
+
+    def onBulkActionFailed(self, app, error):
+        self.onOperationFailed(error, app)
+        self.finishBulkAction(app)
+
+    def finishBulkAction(self, app):
+        self.__bulkClusters.discard(app.cluster)
+        if self.__bulkClusters:
+            return
+
+        progress = self.__bulkProgress
+        self.__bulkProgress = None
+        if self.__mode == Mode.CONNECTORS:
+            self.switchToDocument(Document(progress.report(self.connectorLabel)), progress.description, 'Result')
+
+    def onOperationFailed(self, error, app=None):
+        if not isinstance(error, CancelledError):
+            lines = str(error).strip().splitlines()
+            self.setError(lines[0] if lines else type(error).__name__, app)
+
+    def onConnectorsFailed(self, app, failures):
+        connectorId, error = failures[0]
+        self.setError("%d connectors not loaded, '%s': %s" % (len(failures), connectorId, error), app)
+
+    def setError(self, error, app=None):
+        self.__error = '%s: %s' % (app.cluster, error) if app is not None and self.isMultiCluster() else error
+
+    def updateActivityLabel(self):
+        operations = self.__worker.getPendingOperations()
+        if self.__bulkProgress is not None:
+            text = ' %s [ESC] Cancel ' % self.__bulkProgress.summary()
+        elif operations:
+            text = ' %s... ' % operations[0].description
+            if len(operations) > 1:
+                text += '(+%d pending) ' % (len(operations) - 1)
+            text += '[ESC] Cancel '
+        elif self.__error:
+            text = ' %s ' % self.__error
+        elif self.__watching:
+            text = ' Watching every %ss ' % ('%g' % self.__watchInterval)
+        else:
+            text = ''
+
+        self.__activityLabel.text = text
+
     def hideConnectorsList(self):
         self.__screen.remove_view(self.__connectorsListView)
 
@@ -352,35 +952,158 @@ class UI(ListViewDelegate):
         self.__statusLabel.text = status
 
     def render(self):
-        self.__screen.render()
+        self.timed('UI.render', self.__screen.render)
+
+    def timed(self, name, function, *args):
+        # Keeps a histogram of the durations per name and traces them if requested
+        start = time.time()
+        begin = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            duration = time.perf_counter() - begin
+            histogram = self.__timings.get(name)
+            if histogram is None:
+                histogram = self.__timings[name] = Histogram(self.TIMING_BUCKETS)
+            histogram.observe(duration)
+
+            if self.app.tracer:
+                self.app.tracer.span('ui', name, start, duration)
+
+    def toggleStats(self):
+        self.__statsVisible = not self.__statsVisible
+
+    def updateStatsOverlay(self):
+        self.__screen.remove_views(self.__statsLabels)
+        self.__statsLabels = []
+        if not self.__statsVisible:
+            return
+
+        lines = self.getStatsLines()
+        width = max(len(line) for line in lines)
+        for i, line in enumerate(lines):
+            label = Label(line.ljust(width))
+            label.attributes.append(curses.color_pair(colorpairs.DESCRIPTION))
+            self.__screen.add_view(label, lambda w, h, v, i=i: (max(0, w - width - 1), max(2, h - 1 - len(lines) + i), min(width, w), 1))
+            self.__statsLabels.append(label)
+
+    def getStatsLines(self):
+        def formatSeconds(seconds):
+            return '%.1fms' % (seconds * 1000) if seconds is not None else '-'
+
+        def formatLine(name, histogram, size=None):
+            _, _, count = histogram.snapshot()
+            return self.STATS_FORMAT.format(name[:48], count, formatSeconds(histogram.quantile(0.5)), formatSeconds(histogram.quantile(0.95)),
+                                            formatSeconds(histogram.max), '%.1fKiB' % (size / 1024) if size is not None else '')
+
+        lines = [self.STATS_FORMAT.format('REQUEST', 'N', 'P50', 'P95', 'MAX', 'RECEIVED')]
+        for app in self.apps.values():
+            for (cluster, method, endpoint, status), stats in app.requests.items():
+                name = '%s %s %s' % (method, endpoint, status)
+                lines.append(formatLine('%s %s' % (cluster, name) if self.isMultiCluster() else name, stats.latency, stats.bytes))
+
+        for name, histogram in self.__timings.items():
+            lines.append(formatLine(name, histogram))
+
+        cacheStats = [app.cache.stats() for app in self.apps.values()]
+        hits = sum(stats['hits'] for stats in cacheStats)
+        misses = sum(stats['misses'] for stats in cacheStats)
+        lines.append(' Cache: %d entries, %d hits, %d misses, %.0f%% hit rate ' % (
+            sum(stats['size'] for stats in cacheStats), hits, misses, 100.0 * hits / (hits + misses) if hits + misses else 0.0))
+
+        return lines
 
     def loop(self, stdscr):
         self.__mode = Mode.CONNECTORS
         self.__lineNumbers = True
         self.__document = None
+        self.__reloading = False
+        self.__error = None
+        # Every cluster is reloaded by a worker of its own, one worker is left for the actions of the user
+        self.__worker = BackgroundWorker(max(self.app.concurrency, len(self.apps) + 1))
+        self.__connectors = ConnectorStore()
+        self.__loadingClusters = set()
+        self.__staleClusters = OrderedDict()
+        self.__drift = dict()
+        self.__marked = set()
+        self.__bulkProgress = None
+        self.__bulkClusters = set()
+        self.__clusterFormat = '{:<%d}' % max(len('CLUSTER'), *(len(cluster) for cluster in self.apps))
+
+        self.__generation = 0
+        self.__watchInterval = self.app.watchInterval or self.DEFAULT_WATCH_INTERVAL
+        self.__watching = self.app.watchInterval is not None
+        self.__syncingClusters = set()
+        self.__lastSync = time.monotonic()
         self.setupColors()
 
+        # Poll for keys, so results of background operations get rendered while no key is pressed.
+        stdscr.timeout(self.POLL_INTERVAL_MS)
+        if hasattr(curses, 'set_escdelay'):
+            curses.set_escdelay(25)
+
         self.__screen = ConstrainedBasedScreen(stdscr)
         self.titleElements = []
-        self.__legendElements = self.addLegend(self.__screen, legends.main())
+        self.__activityLabel = Label('')
+        self.__activityLabel.attributes.append(curses.color_pair(colorpairs.HEADER_TEXT))
+        self.__editingFilter = False
+        self.__viewLabel = Label('')
+        self.__viewLabel.attributes.append(curses.color_pair(colorpairs.HEADER_TEXT))
+        self.__viewLabel.attributes.append(curses.A_BOLD)
+        self.__legendElements = self.addLegend(self.__screen, legends.main(self.isMultiCluster(), self.showsDrift()))
         self.__headerElements = self.addHeaderBox(self.__screen)
-        self.__connectorsListView = self.createListView(self.__screen, self.app)
+        self.__connectorsView = ConnectorView(self.__connectors)
+        self.__connectorsListView = self.createListView(self.__screen, self.__connectorsView)
         self.__documentListView = None
+        self.__editingSearch = False
+        self.__searchQuery = ''
+        self.__match = None
+        self.__statsVisible = False
+        self.__statsLabels = []
 
-        self.reloadConnectors()
-        _, _, _, _, _, selectedConnector = self.app.get_data(self.__connectorsListView.get_selected_row_index())
+        self.loadConnectors()
 
         while 1:
             _, screen_width = self.__screen.get_screen_size()
             if self.__document:
                 availableSize = screen_width
                 if self.__lineNumbers:
-                    availableSize = availableSize - len(str(self.__document.number_of_rows())) - 3
-                self.__document.wrapToWidth(availableSize)
+                    availableSize = availableSize - len(str(self.__document.getNumberOfUnwrappedLines())) - 3
+                self.timed('Document.wrapToWidth', self.__document.wrapToWidth, availableSize)
 
+            self.updateActivityLabel()
+            self.updateViewLabel()
+            self.updateStatsOverlay()
             self.render()
 
             key = stdscr.getch()
+            while key == -1 and not self.onIdle():
+                key = stdscr.getch()
+
+            if key == -1:
+                continue
+
+            self.__error = None
+
+            if self.__mode == Mode.CONNECTORS and self.__editingFilter and key not in (keys.UP, keys.DOWN, curses.KEY_RESIZE):
+                self.handleFilterKey(key)
+                continue
+
+            if self.__mode == Mode.DOCUMENT and self.__editingSearch and key not in (keys.UP, keys.DOWN, curses.KEY_RESIZE):
+                self.handleSearchKey(key)
+                continue
+
+            if key == keys.ESCAPE:
+                self.__worker.cancelAll()
+                continue
+
+            if key == keys.Q and self.__mode == Mode.CONNECTORS:
+                self.__worker.cancelAll()
+                exit(0)
+
+            if key == keys.I:
+                self.toggleStats()
+                continue
 
             if self.__mode == Mode.CONNECTORS:
                 if key == curses.KEY_RESIZE:
@@ -388,56 +1111,78 @@ class UI(ListViewDelegate):
 
                 if key == keys.UP:
                     self.__connectorsListView.select_previous()
-                    _, _, _, _, _, selectedConnector = self.app.get_data(self.__connectorsListView.get_selected_row_index())
 
                 if key == keys.DOWN:
                     self.__connectorsListView.select_next()
-                    _, _, _, _, _, selectedConnector = self.app.get_data(self.__connectorsListView.get_selected_row_index())
 
                 if key == keys.L:
                     self.reloadConnectors()
 
+                if key == keys.W:
+                    self.toggleWatch()
+
+                if key == keys.SLASH:
+                    self.__editingFilter = True
+
+                if key == keys.B:
+                    self.cycleSortBy()
+
+                if key == keys.G:
+                    self.cycleGroupBy()
+
+                if key == keys.K and self.isMultiCluster():
+                    self.cycleCluster()
+
+                if key == keys.SPACE:
+                    self.toggleMark()
+
+                if key == keys.A:
+                    self.markShown()
+
+                if key in self.ACTIONS and self.__marked:
+                    self.performBulkAction(*self.ACTIONS[key])
+                    continue
+
+                if key == keys.F:
+                    self.restartAllFailedTasks()
+                    continue
+
+                selectedConnector = self.getSelectedConnector()
+                if not selectedConnector:
+                    continue
+
+                app = self.appOf(selectedConnector)
+
                 if key == keys.O:
-                    jsonContent = self.app.getConnectorOverview(selectedConnector)
-                    document = Document(self.app.prettyfyJson(jsonContent))
-                    self.switchToDocument(document, selectedConnector, 'Overview')
+                    self.openConnectorDocument(selectedConnector, 'Overview', app.getConnectorOverview)
 
                 if key == keys.S:
-                    jsonContent = self.app.getConnectorStatus(selectedConnector)
-                    document = Document(self.app.prettyfyJson(jsonContent))
-                    self.switchToDocument(document, selectedConnector, 'Status')
+                    self.openConnectorDocument(selectedConnector, 'Status', app.getConnectorStatus)
 
                 if key == keys.C:
-                    jsonContent = self.app.getConnectorConfig(selectedConnector)
-                    document = Document(self.app.prettyfyJson(jsonContent))
-                    self.switchToDocument(document, selectedConnector, 'Config')
+                    self.openConnectorDocument(selectedConnector, 'Config', app.getConnectorConfig)
 
                 if key == keys.T:
-                    jsonContent = self.app.getConnectorTasks(selectedConnector)
-                    document = Document(self.app.prettyfyJson(jsonContent))
-                    self.switchToDocument(document, selectedConnector, 'Tasks')
+                    self.openConnectorDocument(selectedConnector, 'Tasks', app.getConnectorTasks)
+
+                if key == keys.V and app.driftDirectory:
+                    self.openDriftDocument(selectedConnector)
 
                 if key == keys.R:
-                    self.app.restartConnector(selectedConnector)
-                    self.app.refreshConnector(self.__connectorsListView.get_selected_row_index())
+                    self.performConnectorAction(selectedConnector, 'Restarting', app.restartConnector)
 
                 if key == keys.P:
-                    self.app.pauseConnector(selectedConnector)
-                    self.app.refreshConnector(self.__connectorsListView.get_selected_row_index())
+                    self.performConnectorAction(selectedConnector, 'Pausing', app.pauseConnector)
 
                 if key == keys.E:
-                    self.app.resumeConnector(selectedConnector)
-                    self.app.refreshConnector(self.__connectorsListView.get_selected_row_index())
+                    self.performConnectorAction(selectedConnector, 'Resuming', app.resumeConnector)
 
                 if key == keys.U:
-                    self.app.updateConnector(selectedConnector)
+                    app.updateConnector(selectedConnector.name)
                     exit(0)
 
                 if key == keys.D:
-                    self.app.duplicateConnector(selectedConnector)
-                    exit(0)
-
-                if key == keys.Q:
+                    app.duplicateConnector(selectedConnector.name)
                     exit(0)
 
             else:
@@ -447,6 +1192,29 @@ class UI(ListViewDelegate):
                 if key == keys.DOWN:
                     self.__documentListView.select_next()
 
+                if key == keys.PAGE_UP:
+                    self.jumpToRow(self.__documentListView.get_selected_row_index() - self.pageSize())
+
+                if key == keys.PAGE_DOWN:
+                    self.jumpToRow(self.__documentListView.get_selected_row_index() + self.pageSize())
+
+                if key == keys.HOME:
+                    self.jumpToRow(0)
+
+                if key == keys.END:
+                    self.__document.layOut()
+                    self.jumpToRow(self.__document.number_of_rows() - 1)
+
+                if key == keys.SLASH:
+                    self.__editingSearch = True
+                    self.__searchQuery = ''
+
+                if key == keys.N:
+                    self.jumpToMatch(self.__documentListView.get_selected_row_index())
+
+                if key == keys.SHIFT_N:
+                    self.jumpToMatch(self.__documentListView.get_selected_row_index(), True)
+
                 if key == keys.O:
                     self.app.openEditor(self.__document.getText())
                     exit(0)
@@ -455,7 +1223,7 @@ class UI(ListViewDelegate):
                     self.__lineNumbers = not self.__lineNumbers
 
                 if key == keys.C and self.isMacOs():
-                    if self.app.number_of_rows() > 0:
+                    if self.__document.number_of_rows() > 0:
                         text = self.__document.getText()
                         subprocess.run("pbcopy", universal_newlines=True, input=text)
                         self.switchToConnectors()
@@ -0,0 +1,82 @@
+import queue
+import threading
+from concurrent.futures import CancelledError
+from functools import partial
+
+
+class Operation:
+
+    def __init__(self, description):
+        self.description = description
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def isCancelled(self):
+        return self.cancelled.is_set()
+
+
+class BackgroundWorker:
+    # Runs blocking operations on daemon threads. Their results are posted back to a queue which
+    # is drained by processPending() on the UI thread, so callbacks never touch curses concurrently.
+
+    def __init__(self, maxWorkers=1):
+        self.__jobs = queue.Queue()
+        self.__results = queue.Queue()
+        self.__operations = []
+        self.__lock = threading.Lock()
+
+        for _ in range(max(1, maxWorkers)):
+            thread = threading.Thread(target=self.__work, daemon=True)
+            thread.start()
+
+    def submit(self, description, function, onSuccess=None, onFailure=None):
+        operation = Operation(description)
+        with self.__lock:
+            self.__operations.append(operation)
+
+        self.__jobs.put((operation, function, onSuccess, onFailure))
+        return operation
+
+    def post(self, callback, *args):
+        self.__results.put(partial(callback, *args))
+
+    def processPending(self):
+        processed = False
+        while True:
+            try:
+                callback = self.__results.get_nowait()
+            except queue.Empty:
+                return processed
+
+            callback()
+            processed = True
+
+    def getPendingOperations(self):
+        with self.__lock:
+            return list(self.__operations)
+
+    def cancelAll(self):
+        for operation in self.getPendingOperations():
+            operation.cancel()
+
+    def __work(self):
+        while True:
+            operation, function, onSuccess, onFailure = self.__jobs.get()
+            try:
+                if operation.isCancelled():
+                    raise CancelledError()
+
+                result = function(operation)
+                self.__results.put(partial(self.__complete, operation, onSuccess, result))
+
+            except Exception as error:
+                self.__results.put(partial(self.__complete, operation, onFailure, error))
+
+    def __complete(self, operation, callback, value):
+        with self.__lock:
+            self.__operations.remove(operation)
+
+        if callback:
+            callback(value)
@@ -2,9 +2,18 @@
 
 ENV_NAME="confluent-connect"
 
-if [ -x "$(command -v conda)" ]; then
-  source activate $ENV_NAME
+BASEDIR=$(dirname "$0")
+PYTHON_FILE="$BASEDIR/.python"
+
+# Activating the conda env takes longer than most modes of the tool, so its interpreter is looked up once and remembered
+read -r PYTHON 2>/dev/null < "$PYTHON_FILE"
+if [ ! -x "$PYTHON" ]; then
+  if [ -x "$(command -v conda)" ]; then
+    source activate $ENV_NAME
+  fi
+  PYTHON=$(command -v python)
+  echo "$PYTHON" > "$PYTHON_FILE"
 fi
 
-BASEDIR=$(dirname "$0")
-python "$BASEDIR/app.py" $@
\ No newline at end of file
+# Importing the tool instead of running app.py as a script lets Python reuse its compiled bytecode
+exec "$PYTHON" -c 'import sys; sys.path.insert(0, sys.argv.pop(1)); import app; app.main()' "$BASEDIR" "$@"
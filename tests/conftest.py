@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+BASEDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BASEDIR)
+sys.path.insert(0, os.path.join(BASEDIR, 'benchmarks'))
+
+from app import App
+from fake_connect import FakeConnectServer
+
+
+@pytest.fixture
+def server():
+    # A fake cluster with a worker supporting expand and restarts of only the failed tasks
+    server = FakeConnectServer(20, failedRate=0.3).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def oldServer():
+    # A fake cluster with a worker older than 2.3, so every connector is loaded by requests of its own
+    server = FakeConnectServer(20, failedRate=0.3, version='2.0.0').start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def largeServer():
+    # A fake cluster with more connectors than the output of a list fits into a pipe
+    server = FakeConnectServer(5000).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def app(server):
+    return App(server.url, concurrency=4)
@@ -0,0 +1,62 @@
+import json
+
+
+def writeJson(filePath, content):
+    with open(filePath, 'w') as file:
+        json.dump(content, file)
+
+
+def readJson(filePath):
+    with open(filePath) as file:
+        return json.load(file)
+
+
+def testBackupWritesAllConfigs(app, server, tmp_path):
+    summary = app.backupConnectors(str(tmp_path))
+
+    assert summary['added'] == list(server.connectors)
+    assert readJson(tmp_path / 'connector-00001.json') == server.connectors['connector-00001']['config']
+    assert readJson(tmp_path / 'ACTIVE_CONNECTORS.json') == ['%s.json' % name for name in server.connectors]
+
+
+def testBackupOnlyRewritesChangedFiles(app, server, tmp_path):
+    app.backupConnectors(str(tmp_path))
+
+    configPath = tmp_path / 'connector-00002.json'
+    writeJson(configPath, dict(readJson(configPath), **{'tasks.max': '7'}))
+    del server.connectors['connector-00005']
+
+    summary = app.backupConnectors(str(tmp_path))
+
+    assert summary['changed'] == ['connector-00002']
+    assert summary['removed'] == ['connector-00005']
+    assert len(summary['unchanged']) == len(server.connectors) - 1
+    assert readJson(configPath)['tasks.max'] == server.connectors['connector-00002']['config']['tasks.max']
+    assert (tmp_path / 'connector-00005.json').exists()
+
+
+def testRemovedConnectorsAreOnlyDeletedWhenPruning(app, server, tmp_path):
+    app.backupConnectors(str(tmp_path))
+    del server.connectors['connector-00005']
+
+    assert app.backupConnectors(str(tmp_path))['removed'] == ['connector-00005']
+    assert app.backupConnectors(str(tmp_path))['removed'] == ['connector-00005']
+    assert (tmp_path / 'connector-00005.json').exists()
+
+    assert app.backupConnectors(str(tmp_path), prune=True)['removed'] == ['connector-00005']
+    assert not (tmp_path / 'connector-00005.json').exists()
+    assert app.backupConnectors(str(tmp_path))['removed'] == []
+
+
+def testEmptyClusterDoesNotPruneTheBackup(app, server, tmp_path):
+    app.backupConnectors(str(tmp_path))
+    server.connectors.clear()
+
+    summary = app.backupConnectors(str(tmp_path), prune=True)
+
+    assert len(summary['removed']) == 20
+    assert len(list(tmp_path.glob('connector-*.json'))) == 20
+
+
+def testBackupOfAMissingDirectoryIsReported(app, tmp_path):
+    assert app.backupConnectors(str(tmp_path / 'missing')) is None
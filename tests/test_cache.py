@@ -0,0 +1,43 @@
+import time
+
+from lib.cache import TTLCache
+
+
+def testEntriesExpireAfterTheirTimeToLive():
+    cache = TTLCache()
+    cache.put('a', 1, 0.01)
+    cache.put('b', 2, 60)
+
+    assert cache.get('a') == (True, 1)
+    time.sleep(0.02)
+    assert cache.get('a') == (False, None)
+    assert cache.get('b') == (True, 2)
+
+
+def testLeastRecentlyUsedEntriesAreEvicted():
+    cache = TTLCache(maxSize=2)
+    cache.put('a', 1, 60)
+    cache.put('b', 2, 60)
+    cache.get('a')
+    cache.put('c', 3, 60)
+
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+
+
+def testActionsInvalidateTheCachedStatus(app, server):
+    app.getConnectorStatus('connector-00001')
+    app.pauseConnector('connector-00001')
+
+    assert app.getConnectorStatus('connector-00001')['connector']['state'] == 'PAUSED'
+    assert server.requests[('GET', '/connectors/{connector}/status')] == 2
+
+
+def testDuplicateDoesNotChangeTheCachedConfig(app, monkeypatch):
+    duplicated = []
+    monkeypatch.setattr(app, 'buildConnector', lambda name, config: duplicated.append((name, config)))
+
+    app.duplicateConnector('connector-00001')
+
+    assert 'name' not in duplicated[0][1]
+    assert app.getConnectorConfig('connector-00001')['name'] == 'connector-00001'
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+from requests import RequestException
+
+from lib.breaker import CircuitBreaker, CircuitOpenError
+from lib.client import ConnectClient
+
+
+def client(server, retries=3, breaker=None):
+    client = ConnectClient(server.url, retries=retries, breaker=breaker)
+    client.RETRY_DELAY = 0.001
+    return client
+
+
+def testBreakerOpensAfterThresholdFailures():
+    breaker = CircuitBreaker(threshold=2, resetTimeout=60)
+
+    breaker.failed()
+    assert breaker.allow()
+    breaker.failed()
+
+    assert breaker.isOpen()
+    assert not breaker.allow()
+    assert breaker.retryIn() > 0
+
+
+def testBreakerLetsASingleProbeThroughAfterTheResetTimeout():
+    breaker = CircuitBreaker(threshold=1, resetTimeout=0.01)
+    breaker.failed()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # A failed probe keeps the circuit open, a successful one closes it
+    breaker.failed()
+    assert breaker.isOpen()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.succeeded()
+    assert not breaker.isOpen()
+    assert breaker.allow()
+
+
+def testIdempotentRequestsAreRetriedOnServerErrors(server):
+    server.errorRate = 1.0
+
+    with pytest.raises(RequestException):
+        client(server, retries=2).get('/connectors')
+
+    assert server.requests[('GET', '/connectors')] == 3
+
+
+def testOtherRequestsAreNotRetriedOnServerErrors(server):
+    server.errorRate = 1.0
+
+    with pytest.raises(RequestException):
+        client(server).post('/connectors/connector-00001/restart')
+
+    assert server.requests[('POST', '/connectors/{connector}/restart')] == 1
+
+
+def testConflictsAreNotRetried(server):
+    with pytest.raises(RequestException):
+        client(server).post('/connectors', {'name': 'connector-00001', 'config': {}})
+
+    assert server.requests[('POST', '/connectors')] == 1
+
+
+def testOpenCircuitFailsWithoutSendingRequests(server):
+    server.errorRate = 1.0
+    breaker = CircuitBreaker(threshold=2, resetTimeout=60)
+    connectClient = client(server, retries=0, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(RequestException):
+            connectClient.get('/')
+
+    with pytest.raises(CircuitOpenError):
+        connectClient.get('/')
+
+    assert server.requests[('GET', '/')] == 2
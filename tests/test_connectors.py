@@ -0,0 +1,52 @@
+from lib.connectors import Connector, ConnectorStore
+
+
+def connector(name, state='RUNNING', cluster='a', topic=None):
+    return Connector.create(state, 'sink', 'worker-1:8083', 1, topic, name, cluster)
+
+
+def names(store):
+    return [(connector.cluster, connector.name) for connector in store]
+
+
+def testConnectorsAreSortedByNameAndCluster():
+    store = ConnectorStore([connector('c', cluster='b'), connector('a'), connector('c', cluster='a')])
+
+    assert names(store) == [('a', 'a'), ('a', 'c'), ('b', 'c')]
+    assert store.indexOf(('b', 'c')) == 2
+    assert store.clusters() == ['a', 'b']
+
+
+def testApplyReplacesAddsAndRemovesConnectors():
+    store = ConnectorStore([connector('a'), connector('b'), connector('c')])
+    version = store.version
+
+    store.apply([connector('b', 'FAILED'), connector('bb')], [('a', 'c')])
+
+    assert names(store) == [('a', 'a'), ('a', 'b'), ('a', 'bb')]
+    assert store.get(('a', 'b')).state == 'FAILED'
+    assert store.indexOf(('a', 'bb')) == 2
+    assert store.indexOf(('a', 'c')) is None
+    assert store.version > version
+
+
+def testApplyKeepsTheSearchIndexInSync():
+    store = ConnectorStore([connector('a', topic='orders'), connector('b', topic='events')])
+    assert store.getSearchIndex().search('orders') == {0}
+
+    # Replacing a connector updates the index in place
+    store.apply([connector('b', topic='orders')], [])
+    assert store.getSearchIndex().search('orders') == {0, 1}
+
+    # Inserting one moves the positions, so the index is rebuilt
+    store.apply([connector('0', topic='payments')], [('a', 'a')])
+    assert store.getSearchIndex().search('orders') == {1}
+    assert store.getSearchIndex().search('payments') == {0}
+
+
+def testSetClusterKeepsTheConnectorsOfOtherClusters():
+    store = ConnectorStore([connector('a', cluster='a'), connector('b', cluster='b')])
+
+    store.setCluster('a', [connector('c', cluster='a')])
+
+    assert names(store) == [('b', 'b'), ('a', 'c')]
@@ -0,0 +1,99 @@
+import textwrap
+
+from lib.document import Document
+
+
+def rows(document):
+    return [document.get_data(i) for i in range(document.number_of_rows())]
+
+
+def testLinesFittingIntoTheWidthAreNotWrapped():
+    document = Document('{\n    "name": "a"\n}')
+
+    assert rows(document) == [(1, '{'), (2, '    "name": "a"'), (3, '}')]
+
+
+def testLongLinesAreWrappedToTheWidth():
+    document = Document('first\none two three four\nlast')
+    document.wrapToWidth(9)
+
+    assert rows(document) == [(1, 'first'), (2, 'one two'), (None, 'three'), (None, 'four'), (3, 'last')]
+
+    document.wrapToWidth(100)
+    assert document.number_of_rows() == 3
+
+
+def testSearchIgnoresCaseAndFollowsTheWidth():
+    document = Document('alpha\none two Match\nmatch')
+
+    assert document.search('MATCH') == 2
+    assert [document.matchRow(k) for k in range(2)] == [1, 2]
+
+    document.wrapToWidth(7)
+    assert [document.matchRow(k) for k in range(2)] == [2, 3]
+
+
+def testFindMatchWrapsAround():
+    document = Document('x\na\nx\na\nx')
+    document.search('a')
+
+    assert document.findMatch(0) == 0
+    assert document.findMatch(1) == 1
+    assert document.findMatch(3) == 0
+    assert document.findMatch(1, backwards=True) == 1
+    assert document.findMatch(2, backwards=True) == 0
+
+
+def testMatchesInTrailingBlankLinesStayWithinTheDocument():
+    document = Document('a\n  \n  ')
+    document.search('  ')
+
+    assert document.number_of_rows() == 1
+    assert [document.matchRow(k) for k in range(document.numberOfMatches())] == [0, 0]
+
+
+def testEmptyQueryMatchesNothing():
+    document = Document('a')
+
+    assert document.search('') == 0
+    assert document.findMatch(0) is None
+
+
+def testLongDocumentsAreLaidOutAsFarAsRowsAreRequested():
+    text = '\n'.join('line %d %s' % (i, 'word ' * (i % 7)) for i in range(5000))
+    document = Document(text)
+    document.wrapToWidth(12)
+
+    assert document.get_data(0) == (1, 'line 0')
+    assert not document.isLaidOut()
+    assert document.number_of_rows() < 5000
+
+    document.layOut()
+    expected = [row for line in text.split('\n') for row in textwrap.wrap(line, 12)]
+    assert document.isLaidOut()
+    assert [row for _, row in rows(document)] == expected
+
+
+def testLayoutContinuesAfterChangingTheWidth():
+    text = '\n'.join('one two three four five six' for _ in range(2000))
+    document = Document(text)
+    document.wrapToWidth(10)
+    document.get_data(100)
+    document.wrapToWidth(20)
+    document.layOut()
+    document.wrapToWidth(10)
+
+    assert document.number_of_rows() < 6000
+    while document.continueLayout(1):
+        pass
+    assert document.number_of_rows() == 6000
+    assert document.get_data(-1) == (None, 'five six')
+
+
+def testMatchRowsAreFoundBeforeTheLayoutIsComplete():
+    document = Document('\n'.join(['one two three'] * 1000 + ['', 'needle']))
+    document.wrapToWidth(8)
+    document.search('needle')
+
+    assert document.matchRow(0) == 2000
+    assert document.isLaidOut()
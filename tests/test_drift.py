@@ -0,0 +1,47 @@
+import json
+import os
+
+from app import App
+
+
+def writeJson(filePath, content):
+    with open(filePath, 'w') as file:
+        json.dump(content, file)
+
+
+def readJson(filePath):
+    with open(filePath) as file:
+        return json.load(file)
+
+
+def testDriftDetection(app, server, tmp_path):
+    app.backupConnectors(str(tmp_path))
+    server.connectors['connector-00001']['config']['tasks.max'] = '9'
+    writeJson(tmp_path / 'connector-00002.json', dict(readJson(tmp_path / 'connector-00002.json'), **{'tasks.max': 3}))
+    os.remove(tmp_path / 'connector-00003.json')
+    writeJson(tmp_path / 'deleted.json', {'name': 'deleted', 'config': {}})
+    (tmp_path / 'broken.json').write_text('{')
+    (tmp_path / 'connector-00004.json').write_text('{')
+    (tmp_path / '.interrupted.tmp').write_text('{')
+
+    results = app.detectDrift(str(tmp_path))
+
+    assert results['connector-00001'] == ('drifted', [('tasks.max', '2', '9')], None)
+    # Values of other JSON types are compared as the strings returned by the REST interface
+    assert results['connector-00002'][0] == 'in-sync'
+    assert results['connector-00003'][0] == 'untracked'
+    assert results['deleted'][0] == 'missing'
+    assert results['broken'][0] == 'error'
+    # A corrupt backup of a live connector is reported once, as an error and not as untracked
+    assert results['connector-00004'][0] == 'error'
+    assert 'connector-00004.json' not in results
+    assert '.interrupted.tmp' not in results
+
+
+def testDriftOfOldWorkers(oldServer, tmp_path):
+    app = App(oldServer.url, concurrency=4)
+    app.backupConnectors(str(tmp_path))
+
+    results = app.detectDrift(str(tmp_path))
+
+    assert {state for state, _, _ in results.values()} == {'in-sync'}
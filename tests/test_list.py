@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+
+
+def testListOnlyLoadsTheConfigsOfMatchingConnectors(app, server):
+    failed = [name for name, connector in server.connectors.items() if connector['state'] == 'FAILED']
+
+    connectors = list(app.listConnectors(states=['FAILED']))
+
+    assert sorted(connector.name for connector in connectors) == failed
+    assert server.requests[('GET', '/connectors/{connector}/config')] == len(failed)
+
+
+def testListFormats(app, server):
+    ndjson = io.StringIO()
+    app.printConnectors('ndjson', out=ndjson)
+    assert [json.loads(line)['name'] for line in ndjson.getvalue().splitlines()] == list(server.connectors)
+
+    output = io.StringIO()
+    app.printConnectors('json', types=['source'], out=output)
+    assert [connector['type'] for connector in json.loads(output.getvalue())] == ['source'] * 5
+
+    output = io.StringIO()
+    app.printConnectors('csv', out=output)
+    rows = list(csv.reader(io.StringIO(output.getvalue())))
+    assert rows[0][-2:] == ['name', 'cluster'] and len(rows) == len(server.connectors) + 1
+
+
+def testListStopsQuietlyWhenTheReaderExits(largeServer):
+    # The list does not fit into the buffer of the pipe, so writing it fails once the reader exits
+    process = subprocess.Popen([sys.executable, 'app.py', largeServer.url, '--list'], cwd=os.path.join(os.path.dirname(__file__), '..'),
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    process.stdout.readline()
+    process.stdout.close()
+    stderr = process.stderr.read()
+    process.wait()
+
+    assert b'BrokenPipeError' not in stderr
+    assert process.returncode == 1
@@ -0,0 +1,77 @@
+import argparse
+import time
+
+import pytest
+
+from app import App
+
+
+def testParallelLoadKeepsTheOrderOfTheConnectors(oldServer):
+    app = App(oldServer.url, concurrency=4)
+    loaded = []
+
+    connectors = app.loadConnectors(list(oldServer.connectors), lambda i, n, connectorId: loaded.append(i))
+
+    assert [connector.name for connector in connectors] == list(oldServer.connectors)
+    assert loaded == list(range(1, len(oldServer.connectors) + 1))
+
+
+def testFailedParallelLoadDoesNotWaitForTheOtherRequests(app):
+    def request(connectorId):
+        time.sleep(0.05)
+        if connectorId == 1:
+            raise ValueError('failed')
+
+    start = time.monotonic()
+    with pytest.raises(ValueError):
+        app.loadParallel(request, list(range(100)))
+
+    assert time.monotonic() - start < 1.0
+
+
+def testConnectorsAreLoadedWithASingleRequest(app, server):
+    connectors = app.fetchConnectors()
+
+    assert [connector.name for connector in connectors] == list(server.connectors)
+    assert sum(server.requests.values()) == 1
+
+
+def testConnectorsAreLoadedOneByOneOnOldWorkers(oldServer):
+    connectors = App(oldServer.url, concurrency=4).fetchConnectors()
+
+    assert [connector.name for connector in connectors] == list(oldServer.connectors)
+    assert oldServer.requests[('GET', '/connectors/{connector}/status')] == len(oldServer.connectors)
+
+
+def testChangesOnlyLoadTheConfigsOfChangedConnectors(app, server):
+    connectors = app.fetchConnectors()
+    server.connectors['connector-00003']['state'] = 'PAUSED'
+    del server.connectors['connector-00004']
+    server.resetRequests()
+
+    changed, removed = app.fetchConnectorChanges(connectors)
+
+    assert [(connector.name, connector.state) for connector in changed] == [('connector-00003', 'PAUSED')]
+    assert removed == [(app.cluster, 'connector-00004')]
+    assert server.requests[('GET', '/connectors/{connector}/config')] == 1
+
+
+def testFailedConnectorsAreReportedAndSkipped(app):
+    failures = {}
+
+    connectors = app.loadConnectors(['connector-00001', 'unknown', 'connector-00002'],
+                                    onFailed=lambda connectorId, error: failures.__setitem__(connectorId, error))
+
+    assert [connector.name if connector else None for connector in connectors] == ['connector-00001', None, 'connector-00002']
+    assert list(failures) == ['unknown']
+
+
+def testClustersWithTheSameNameAreRejected(tmp_path):
+    clustersFile = tmp_path / 'clusters.json'
+    clustersFile.write_text('["http://connect:8083/"]')
+    args = argparse.Namespace(URL=['http://connect:8083'], clusters=str(clustersFile))
+
+    with pytest.raises(SystemExit) as exit:
+        App.clustersFromArgs(args)
+
+    assert exit.value.code == 2
@@ -0,0 +1,41 @@
+import argparse
+
+import pytest
+
+from app import App
+from lib.metrics import MetricsExporter, endpointOf
+
+
+def testServeMetricsAddressIsValidated():
+    assert App.parseHostAndPort('9100') == ('', 9100)
+    assert App.parseHostAndPort('localhost:9100') == ('localhost', 9100)
+
+    for value in ['abc', 'localhost:', '99999']:
+        with pytest.raises(argparse.ArgumentTypeError):
+            App.parseHostAndPort(value)
+
+
+def testEndpointsAreNamedWithoutConnectorNames():
+    assert endpointOf('/connectors/a/tasks/1/restart') == '/connectors/{connector}/tasks/{task}/restart'
+    assert endpointOf('/connectors') == '/connectors'
+
+
+def testMetricsOfThePolledCluster(app, server):
+    exporter = MetricsExporter([app], 15)
+    exporter.poll()
+    failed = sum(1 for connector in server.connectors.values() if connector['state'] == 'FAILED')
+
+    metrics = exporter.getSnapshot().decode('utf-8')
+
+    assert 'kafka_connect_up{cluster="%s"} 1' % app.cluster in metrics
+    assert 'kafka_connect_connectors{cluster="%s",state="FAILED"} %d' % (app.cluster, failed) in metrics
+    assert 'kafka_connect_rest_request_duration_seconds_count' in metrics
+
+
+def testUnreachableClusterIsReportedAsDown():
+    app = App('http://127.0.0.1:1', concurrency=1)
+    app.client.retries = 0
+    exporter = MetricsExporter([app], 15)
+    exporter.poll()
+
+    assert 'kafka_connect_up{cluster="%s"} 0' % app.cluster in exporter.getSnapshot().decode('utf-8')
@@ -0,0 +1,64 @@
+import pytest
+
+from app import App
+from lib.connectors import SORT_KEYS, Connector
+
+
+def failedConnectors(server):
+    return [name for name, connector in server.connectors.items() if connector['state'] == 'FAILED' or 'FAILED' in connector['tasks']]
+
+
+@pytest.mark.parametrize('version', ['3.6.0', '2.0.0'])
+def testRestartOnlyRestartsFailedConnectorsAndTasks(server, version):
+    server.version = version
+    app = App(server.url, concurrency=4)
+    failed = failedConnectors(server)
+
+    errors = app.restartAllFailedTasks()
+
+    assert sorted(errors) == failed and not any(errors.values())
+    assert failedConnectors(server) == []
+    assert server.requests[('GET', '/')] == 1
+
+
+def testOnlyFailedRestartIsUsedByNewWorkers(app, server):
+    failed = failedConnectors(server)
+
+    app.restartAllFailedTasks()
+
+    assert server.requests[('POST', '/connectors/{connector}/restart')] == len(failed)
+    assert server.requests[('POST', '/connectors/{connector}/tasks/{task}/restart')] == 0
+
+
+@pytest.mark.parametrize('version, supported', [('3.0.0', True), ('2.8.1', False), ('7.0.1-ccs', True), ('6.2.0-ce', False)])
+def testVersionsSupportingOnlyFailedRestarts(app, version, supported):
+    app.version = version
+
+    assert app.supportsRestartOnlyFailed() == supported
+
+
+def testRestartedConnectorsAreLoadedAsRestarting(app, server):
+    connectors = app.fetchConnectors()
+    failed = failedConnectors(server)
+
+    app.restartAllFailedTasks()
+    changed, _ = app.fetchConnectorChanges(connectors)
+
+    assert failed and {connector.name for connector in changed if connector.state == 'RESTARTING'} == set(failed)
+    assert [connector for connector in app.fetchConnectors() if connector.state == 'RESTARTING'] == []
+
+
+def testRestartingConnectorsAreSortedBeforeRunningOnes():
+    connectors = [Connector.create(state, 'sink', 'worker-1:8083', 1, None, state.lower()) for state in ['RUNNING', 'STOPPED', 'RESTARTING', 'FAILED']]
+
+    assert [connector.state for connector in sorted(connectors, key=SORT_KEYS['state'])] == ['FAILED', 'RESTARTING', 'STOPPED', 'RUNNING']
+
+
+def testMarkedConnectorsLookUpTheVersionOnce(app, server):
+    failed = failedConnectors(server)
+
+    errors = app.performBulkAction(app.bulkAction('restartFailedTasks'), failed)
+
+    assert not any(errors.values())
+    assert failedConnectors(server) == []
+    assert server.requests[('GET', '/')] == 1
@@ -0,0 +1,46 @@
+import json
+from os import path
+
+
+def writeJson(filePath, content):
+    with open(filePath, 'w') as file:
+        json.dump(content, file)
+
+
+def testRestorePlansCreatesUpdatesAndErrors(app, tmp_path):
+    writeJson(tmp_path / 'new.json', {'name': 'new', 'config': {'connector.class': 'io.confluent.connect.jdbc.JdbcSinkConnector'}})
+    writeJson(tmp_path / 'updated.json', dict(app.getConnectorConfig('connector-00001'), **{'tasks.max': '9'}))
+    writeJson(tmp_path / 'unchanged.json', app.getConnectorConfig('connector-00002'))
+    writeJson(tmp_path / 'null.json', {'name': 'connector-00003', 'config': None})
+    writeJson(tmp_path / 'unnamed.json', {'tasks.max': '1'})
+    (tmp_path / 'broken.json').write_text('{')
+
+    liveConfigs = app.getConnectorConfigs()
+    plan = {}
+    for filename, config in app.loadConfigFilesFromDirectory(str(tmp_path)).items():
+        _, action, name, _, diff = app.planRestore(filename, config, liveConfigs)
+        plan[path.basename(filename)] = (action, name, diff)
+
+    assert plan['new.json'][:2] == ('create', 'new')
+    assert plan['updated.json'] == ('update', 'connector-00001', [('tasks.max', '2', '9')])
+    assert plan['unchanged.json'][0] == 'skip'
+    assert [plan[filename][0] for filename in ['null.json', 'unnamed.json', 'broken.json']] == ['error'] * 3
+
+
+def testDryRunDoesNotChangeTheCluster(app, server, tmp_path):
+    writeJson(tmp_path / 'a.json', {'name': 'connector-00002', 'config': {'tasks.max': '9'}})
+
+    assert app.restoreConnectors(str(tmp_path), True, dryRun=True) == []
+    assert server.connectors['connector-00002']['config']['tasks.max'] == '3'
+
+
+def testRestoreContinuesAfterErrors(app, server, tmp_path):
+    writeJson(tmp_path / 'a.json', {'name': 'connector-00001', 'config': None})
+    writeJson(tmp_path / 'b.json', {'name': 'connector-00002', 'config': {'tasks.max': '9'}})
+    writeJson(tmp_path / 'c.json', {'name': 'new', 'config': {'tasks.max': '1'}})
+
+    results = app.restoreConnectors(str(tmp_path), True)
+
+    assert [(action, error is None) for _, action, _, error in results] == [('error', False), ('update', True), ('create', True)]
+    assert server.connectors['connector-00002']['config']['tasks.max'] == '9'
+    assert 'new' in server.connectors
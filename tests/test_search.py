@@ -0,0 +1,38 @@
+from lib.search import TrigramIndex
+
+
+def testSearchMatchesAllWordsIgnoringCase():
+    index = TrigramIndex(['jdbc-sink-orders', 'JDBC-Source-Orders', 'mqtt-sink-events'])
+
+    assert index.search('orders') == {0, 1}
+    assert index.search('SINK orders') == {0}
+    assert index.search('missing') == set()
+
+
+def testSearchMatchesWordsShorterThanATrigram():
+    index = TrigramIndex(['ab-1', 'cd-2', 'ab-3'])
+
+    assert index.search('ab') == {0, 2}
+    assert index.search('-3') == {2}
+
+
+def testEmptyQueryMatchesEverything():
+    index = TrigramIndex(['a', 'b', 'c'])
+
+    assert index.search('') == {0, 1, 2}
+    assert index.search('  ') == {0, 1, 2}
+
+
+def testSearchIsLimitedToCandidates():
+    index = TrigramIndex(['orders-1', 'orders-2', 'events-1'])
+
+    assert index.search('orders', candidates={1, 2}) == {1}
+
+
+def testUpdateReplacesTheTrigramsOfAText():
+    index = TrigramIndex(['orders', 'events'])
+    index.update(0, 'payments')
+
+    assert index.search('orders') == set()
+    assert index.search('payments') == {0}
+    assert index.search('events') == {1}